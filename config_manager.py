@@ -0,0 +1,71 @@
+"""Configuração persistente do aplicativo.
+
+Mantém o ``ConfigManager`` e as constantes usadas nos valores padrão fora de
+:mod:`video_editor_gui`, para que carregar/salvar a configuração não exija
+importar o tkinter/ttkbootstrap.
+"""
+
+import os
+import json
+import logging
+from typing import Dict, Any
+
+CONFIG_FILE = "video_editor_config.json"
+
+RESOLUTIONS = ["1080p (1920x1080)", "720p (1280x720)", "Vertical (1080x1920)", "480p (854x480)"]
+SUBTITLE_POSITIONS = {
+    "Inferior Central": 2, "Inferior Esquerda": 1, "Inferior Direita": 3,
+    "Meio Central": 5, "Meio Esquerda": 4, "Meio Direita": 6,
+    "Superior Central": 8, "Superior Esquerda": 7, "Superior Direita": 9
+}
+SLIDESHOW_TRANSITIONS = ["fade", "wipeleft", "wiperight", "wipeup", "wipedown", "slideleft", "slideright", "slideup", "slidedown", "circlecrop", "rectcrop", "distance", "fadegrays", "radial", "diagtl", "diagtr", "diagbl", "diagbr", "hlslice", "hrslice", "vuslice", "vdslice"]
+SLIDESHOW_MOTIONS = ["Nenhum", "Zoom In", "Zoom Out", "Pan Esquerda", "Pan Direita", "Aleatório"]
+
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigManager:
+    """Gerencia o carregamento e salvamento da configuração do aplicativo."""
+    @staticmethod
+    def default_config() -> Dict[str, Any]:
+        return {
+            'ffmpeg_path': '', 'output_folder': '', 'last_video_folder': '',
+            'last_audio_folder': '', 'last_image_folder': '', 'last_srt_folder': '',
+            'video_codec': 'Automático', 'resolution': RESOLUTIONS[0],
+            'narration_volume': 0, 'music_volume': -15, 'subtitle_fontsize': 28,
+            'subtitle_textcolor': '#FFFFFF', 'subtitle_outlinecolor': '#000000',
+            'subtitle_position': list(SUBTITLE_POSITIONS.keys())[0], 'subtitle_bold': True,
+            'subtitle_italic': False, 'subtitle_font_file': '',
+            'image_duration': 5,
+            'slideshow_transition': SLIDESHOW_TRANSITIONS[0],
+            'slideshow_motion': SLIDESHOW_MOTIONS[1],
+            'encoder_cache': {},
+        }
+
+    @staticmethod
+    def load_config() -> Dict[str, Any]:
+        default_config = ConfigManager.default_config()
+        try:
+            if os.path.exists(CONFIG_FILE):
+                # Leitura binária: o json decodifica os bytes direto, sem str intermediária.
+                with open(CONFIG_FILE, 'rb') as f:
+                    if f.peek(1):
+                        default_config.update(json.load(f))
+        except Exception as e:
+            logger.warning(f"Não foi possível carregar o arquivo de configuração: {e}")
+        return default_config
+
+    @staticmethod
+    def save_config(config: Dict[str, Any]) -> None:
+        # Grava em um arquivo temporário e troca de uma vez, para que uma
+        # interrupção no meio da escrita não corrompa a configuração existente.
+        temp_path = f"{CONFIG_FILE}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(config, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, CONFIG_FILE)
+        except Exception as e:
+            logger.error(f"Erro ao salvar o arquivo de configuração: {e}")
+            try: os.remove(temp_path)
+            except OSError: pass
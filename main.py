@@ -1,21 +1,25 @@
 """Ponto de entrada principal do aplicativo.
 
 Este módulo fornece uma camada fina que reexporta as classes e constantes
-definidas em :mod:`video_editor_gui` para facilitar a importação em outros
-locais (incluindo os testes unitários). Quando executado diretamente, abre a
-interface gráfica.
+definidas em :mod:`config_manager` e :mod:`video_editor_gui` para facilitar a
+importação em outros locais (incluindo os testes unitários). Quando executado
+diretamente, abre a interface gráfica.
+
+A interface gráfica só é importada quando ``VideoEditorApp``/``run_app`` são
+acessados, de modo que ``python main.py --help`` e ``from main import
+ConfigManager`` não carregam o tkinter.
 """
 
 from __future__ import annotations
 
+import copy
+import os
 import sys
 
-import video_editor_gui
-from video_editor_gui import (
-    VideoEditorApp,
+import config_manager
+from config_manager import (
     SUBTITLE_POSITIONS,
     CONFIG_FILE as _CONFIG_FILE,
-    run_app,
     ConfigManager as _ConfigManager,
 )
 
@@ -36,6 +40,30 @@ __all__ = [
 # Config file path used by ConfigManager.  Exposed so tests can monkeypatch it.
 CONFIG_FILE = _CONFIG_FILE
 
+# Symbols resolved from video_editor_gui on first access (PEP 562).
+_GUI_EXPORTS = ("VideoEditorApp", "run_app")
+
+
+def __getattr__(name: str):
+    if name in _GUI_EXPORTS:
+        import video_editor_gui
+
+        value = getattr(video_editor_gui, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Cache em memória da última configuração lida, indexado por caminho + mtime.
+_CONFIG_CACHE = {"path": None, "mtime": None, "data": None}
+
+
+def _config_mtime(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
 
 class ConfigManager:
     """Wrapper que garante o uso do ``CONFIG_FILE`` deste módulo."""
@@ -44,14 +72,24 @@ class ConfigManager:
     def load_config() -> dict:
         global CONFIG_FILE
         # Mantém o módulo de origem sincronizado
-        video_editor_gui.CONFIG_FILE = CONFIG_FILE
-        return _ConfigManager.load_config()
+        config_manager.CONFIG_FILE = CONFIG_FILE
+        mtime = _config_mtime(CONFIG_FILE)
+        if (mtime is not None and _CONFIG_CACHE["path"] == CONFIG_FILE
+                and _CONFIG_CACHE["mtime"] == mtime):
+            return copy.deepcopy(_CONFIG_CACHE["data"])
+        config = _ConfigManager.load_config()
+        if mtime is not None:
+            _CONFIG_CACHE.update(path=CONFIG_FILE, mtime=mtime, data=copy.deepcopy(config))
+        return config
 
     @staticmethod
     def save_config(config: dict) -> None:
         global CONFIG_FILE
-        video_editor_gui.CONFIG_FILE = CONFIG_FILE
+        config_manager.CONFIG_FILE = CONFIG_FILE
         _ConfigManager.save_config(config)
+        # A próxima leitura passa pelo carregador de config_manager, que é quem
+        # mescla os padrões; o cache é preenchido de novo a partir dele.
+        _CONFIG_CACHE.update(path=None, mtime=None, data=None)
 
 
 def print_usage() -> None:
@@ -62,6 +100,8 @@ def print_usage() -> None:
 
 def start_gui() -> None:
     """Inicializa a aplicação gráfica."""
+    from video_editor_gui import run_app
+
     run_app()
 
 
@@ -1,7 +1,7 @@
 import threading
 import queue
 import time
-from video_processing_logic import process_entrypoint
+from video_processing_logic import submit_export
 
 # Simula entrada de parâmetros mínimos para um vídeo simples
 params = {
@@ -34,18 +34,17 @@ params = {
 progress_queue = queue.Queue()
 cancel_event = threading.Event()
 
-# Roda a exportação em thread para simular o app
-def run_export():
-    process_entrypoint(params, progress_queue, cancel_event)
+# Roda a exportação no pool de exportação, como o app
+future = submit_export(params, progress_queue, cancel_event)
 
-threading.Thread(target=run_export).start()
-
-# Coleta os logs
+# Coleta os logs; o produtor sempre envia "finish", então get() pode bloquear
 while True:
-    try:
-        msg = progress_queue.get(timeout=1)
-        print(msg)
-        if msg[0] == "finish":
-            break
-    except queue.Empty:
-        continue
+    msg = progress_queue.get()
+    print(msg)
+    if msg[0] == "finish":
+        break
+
+future.result()
+# Mensagens enviadas após o "finish" (status final)
+while not progress_queue.empty():
+    print(progress_queue.get_nowait())
@@ -18,3 +18,37 @@ def test_save_and_load_config(tmp_path, monkeypatch):
     loaded = ConfigManager.load_config()
     for key, value in sample.items():
         assert loaded[key] == value
+
+
+def test_load_config_uses_cache_until_file_changes(tmp_path, monkeypatch):
+    import main
+
+    temp_file = tmp_path / "config.json"
+    monkeypatch.setattr("main.CONFIG_FILE", str(temp_file))
+    ConfigManager.save_config({"music_volume": -20})
+
+    first = ConfigManager.load_config()
+    first["music_volume"] = 99
+    assert ConfigManager.load_config()["music_volume"] == -20
+
+    calls = []
+    monkeypatch.setattr(main._ConfigManager, "load_config", staticmethod(lambda: calls.append(1) or {}))
+    ConfigManager.load_config()
+    assert calls == []
+
+    temp_file.write_text(json.dumps({"music_volume": -5}), encoding="utf-8")
+    os.utime(temp_file, ns=(0, 0))
+    ConfigManager.load_config()
+    assert calls == [1]
+
+
+def test_save_config_sends_next_load_through_the_loader(tmp_path, monkeypatch):
+    import main
+
+    monkeypatch.setattr("main.CONFIG_FILE", str(tmp_path / "config.json"))
+    ConfigManager.save_config({"music_volume": -20})
+    ConfigManager.load_config()
+    ConfigManager.save_config({"music_volume": -10})
+
+    monkeypatch.setattr(main._ConfigManager, "load_config", staticmethod(lambda: {"music_volume": "migrado"}))
+    assert ConfigManager.load_config() == {"music_volume": "migrado"}
@@ -1,15 +1,23 @@
+import io
+import os
+
 import pytest
-from pyvirtualdisplay import Display
 from main import VideoEditorApp, SUBTITLE_POSITIONS
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def app():
-    display = Display(visible=0, size=(800, 600))
-    display.start()
+    display = None
+    if not os.environ.get("DISPLAY"):
+        from pyvirtualdisplay import Display
+
+        display = Display(visible=0, size=(800, 600))
+        display.start()
     application = VideoEditorApp()
     yield application
     application.root.destroy()
+    if display is not None:
+        display.stop()
 
 
 def test_gather_processing_params(app):
@@ -22,10 +30,16 @@ def test_gather_processing_params(app):
     app.subtitle_position_var.set(list(SUBTITLE_POSITIONS.keys())[0])
     app.subtitle_font_file.set("/tmp/font.ttf")
     app.available_encoders_cache = ["libx264"]
+    app.transition_var.set("wipeleft")
+    app.motion_var.set("Zoom Out")
+    app.batch_video_parent_folder.set("/tmp/videos")
 
     params = app._gather_processing_params()
     assert params["ffmpeg_path"] == "/usr/bin/ffmpeg"
     assert params["available_encoders"] == ["libx264"]
+    assert params["slideshow_transition"] == "wipeleft"
+    assert params["slideshow_motion"] == "Zoom Out"
+    assert params["batch_video_folder"] == "/tmp/videos"
     style = params["subtitle_style"]
     assert style["fontsize"] == 32
     assert style["text_color"] == "#ABCDEF"
@@ -36,6 +50,9 @@ def test_gather_processing_params(app):
 
 
 def _visible(widget):
+    # Quadros de modos ainda não usados só são criados quando exibidos.
+    if widget is None:
+        return False
     widget.update_idletasks()
     return widget.winfo_manager() != ""
 
@@ -43,21 +60,176 @@ def _visible(widget):
 def test_update_ui_for_media_type(app):
     app.media_type.set("video_single")
     app.update_ui_for_media_type()
-    app.root.update()
+    app.root.update_idletasks()
     assert _visible(app.single_inputs_frame)
-    assert not _visible(app.batch_inputs_frame)
-    assert not _visible(app.slideshow_section)
+    assert not _visible(getattr(app, "batch_inputs_frame", None))
+    assert not _visible(getattr(app, "slideshow_section", None))
 
     app.media_type.set("image_folder")
     app.update_ui_for_media_type()
-    app.root.update()
-    assert _visible(app.slideshow_section)
+    app.root.update_idletasks()
+    assert _visible(getattr(app, "slideshow_section", None))
     assert _visible(app.single_inputs_frame)
-    assert not _visible(app.batch_inputs_frame)
+    assert not _visible(getattr(app, "batch_inputs_frame", None))
 
     app.media_type.set("batch")
     app.update_ui_for_media_type()
-    app.root.update()
+    app.root.update_idletasks()
     assert not _visible(app.single_inputs_frame)
-    assert _visible(app.batch_inputs_frame)
-    assert not _visible(app.slideshow_section)
+    assert _visible(getattr(app, "batch_inputs_frame", None))
+    assert not _visible(getattr(app, "slideshow_section", None))
+
+
+_ENCODERS_OUTPUT = (
+    "Encoders:\n"
+    " V..... = Video\n"
+    " A..... = Audio\n"
+    " ------\n"
+    " V....D libx264  libx264 H.264 / AVC / MPEG-4 AVC\n"
+    " V....D h264_nvenc  NVIDIA NVENC H.264 encoder\n"
+    " A....D aac  AAC (Advanced Audio Coding)\n"
+    " V....D h264_qsv  listado fora da seção de vídeo\n"
+)
+
+
+class _FakeEncodersProcess:
+    def __init__(self, cmd, **kwargs):
+        _FakeEncodersProcess.calls.append(cmd)
+        self.stdout = io.StringIO(_ENCODERS_OUTPUT)
+        self.returncode = None
+        self.killed = False
+        _FakeEncodersProcess.last = self
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+    def wait(self, timeout=None):
+        if self.returncode is None:
+            self.returncode = 0
+        return self.returncode
+
+
+def test_check_encoders_is_cached_per_executable(tmp_path, monkeypatch):
+    import subprocess
+    from video_editor_gui import FFmpegManager
+
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text("")
+    calls = _FakeEncodersProcess.calls = []
+
+    monkeypatch.setattr(subprocess, "Popen", _FakeEncodersProcess)
+    monkeypatch.setattr(FFmpegManager, "_encoder_works", staticmethod(lambda path, name: True))
+    assert FFmpegManager.check_encoders(str(ffmpeg)) == ["libx264", "h264_nvenc"]
+    # A leitura para na primeira linha fora da seção de encoders de vídeo.
+    assert _FakeEncodersProcess.last.killed
+    assert FFmpegManager.check_encoders(str(ffmpeg)) == ["libx264", "h264_nvenc"]
+    assert len(calls) == 1
+
+
+def test_notifying_queue_calls_notify_after_each_put():
+    from video_editor_gui import NotifyingQueue
+
+    seen = []
+    q = NotifyingQueue(lambda: seen.append(q.qsize()))
+    q.put(("status", "a", "info"))
+    q.put(("progress", 0.5))
+    assert seen == [1, 2]
+    assert q.get_nowait() == ("status", "a", "info")
+
+
+def test_encoders_cache_round_trips_through_config(tmp_path, monkeypatch):
+    import subprocess
+    from video_editor_gui import FFmpegManager
+
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text("")
+    st = ffmpeg.stat()
+    FFmpegManager.seed_encoders_cache({f"{ffmpeg}|{st.st_mtime_ns}|{st.st_size}": ["libx264", "hevc_nvenc"]})
+
+    def fail(*args, **kwargs):
+        raise AssertionError("ffmpeg não deveria ser executado")
+
+    monkeypatch.setattr(subprocess, "Popen", fail)
+    assert FFmpegManager.check_encoders(str(ffmpeg)) == ["libx264", "hevc_nvenc"]
+    assert FFmpegManager.dump_encoders_cache(str(ffmpeg)) == {
+        f"{ffmpeg}|{st.st_mtime_ns}|{st.st_size}": ["libx264", "hevc_nvenc"]
+    }
+
+
+def test_check_encoders_keeps_only_working_hardware_encoders(tmp_path, monkeypatch):
+    import subprocess
+    from video_editor_gui import FFmpegManager
+
+    ffmpeg = tmp_path / "ffmpeg-hw"
+    ffmpeg.write_text("")
+    _FakeEncodersProcess.calls = []
+    monkeypatch.setattr(subprocess, "Popen", _FakeEncodersProcess)
+    monkeypatch.setattr(FFmpegManager, "_encoder_works", staticmethod(lambda path, name: False))
+    assert FFmpegManager.check_encoders(str(ffmpeg)) == ["libx264"]
+
+
+class _FakeDrainApp:
+    """Só o necessário para rodar VideoEditorApp._drain_queue sem abrir a janela."""
+    def __init__(self, messages):
+        import queue
+        import threading
+
+        self.progress_queue = queue.Queue()
+        for message in messages:
+            self.progress_queue.put(message)
+        self._drain_pending = threading.Event()
+        self._draining = False
+        self.progress_bar = {}
+        self.batch_progress_bar = {}
+        self.events = []
+        self.root = self
+
+    def after_idle(self, func, *args):
+        self.events.append(("after_idle", func, args))
+
+    def _format_status_line(self, text, tag):
+        return text, tag
+
+    def _insert_status_lines(self, lines):
+        self.events.append(("lines", [text for text, _ in lines], self.progress_bar.get("value")))
+
+    def _finalize_processing_ui_state(self, success):
+        self.events.append(("finish", success))
+
+
+def test_drain_queue_applies_earlier_status_before_finish():
+    from video_editor_gui import VideoEditorApp
+
+    fake = _FakeDrainApp([("status", "a", "info"), ("progress", 0.5), ("status", "b", "info"),
+                          ("finish", True), ("status", "c", "info")])
+    VideoEditorApp._drain_queue(fake)
+    assert fake.events == [("lines", ["a", "b"], 50.0), ("finish", True), ("lines", ["c"], 50.0)]
+
+
+def test_drain_queue_defers_dialogs_and_does_not_reenter():
+    from video_editor_gui import VideoEditorApp
+
+    fake = _FakeDrainApp([("status", "a", "info"), ("messagebox", "info", "Título", "Texto")])
+    fake._show_messagebox = "show"
+    VideoEditorApp._drain_queue(fake)
+    assert fake.events == [("lines", ["a"], None), ("after_idle", "show", ("info", "Título", "Texto"))]
+    assert not fake._draining
+
+    fake.progress_queue.put(("status", "b", "info"))
+    fake._draining = True
+    VideoEditorApp._drain_queue(fake)
+    assert fake.progress_queue.qsize() == 1
+
+
+def test_forget_missing_stats_keeps_hits():
+    from types import SimpleNamespace
+    from video_editor_gui import VideoEditorApp
+
+    hit = (1.0, object())
+    fake = SimpleNamespace(_stat_cache={"/existe": hit, "/faltava": (1.0, None)})
+    VideoEditorApp._forget_missing_stats(fake)
+    assert fake._stat_cache == {"/existe": hit}
@@ -1,9 +1,40 @@
 import json
 import subprocess
+import sys
+
+import pytest
 
 import video_processing_logic as v
 
 
+@pytest.fixture
+def recorded_commands(monkeypatch):
+    """Substitui ``_execute_ffmpeg`` e devolve a lista dos comandos que seriam executados."""
+    commands = []
+
+    def fake_execute(cmd, duration, progress_callback, cancel_event, log_prefix, progress_queue):
+        commands.append(cmd)
+        return True
+
+    monkeypatch.setattr(v, "_execute_ffmpeg", fake_execute)
+    return commands
+
+
+# Os testes de _execute_ffmpeg usam um script de shell no lugar do FFmpeg.
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="usa um script de shell no lugar do FFmpeg")
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path):
+    """Cria um "FFmpeg" executável com o corpo de script de shell indicado."""
+    def make(body):
+        fake = tmp_path / "ffmpeg"
+        fake.write_text("#!/bin/sh\n" + body)
+        fake.chmod(0o755)
+        return str(fake)
+    return make
+
+
 def test_parse_resolution():
     assert v._parse_resolution("720p (1280x720)") == (1280, 720)
     assert v._parse_resolution("invalid") == (1920, 1080)
@@ -20,6 +51,23 @@ def test_get_codec_params_gpu():
     assert out[1] == "h264_nvenc"
 
 
+def test_get_codec_params_other_hardware_encoders():
+    qsv = v._get_codec_params({"video_codec": "Automático", "available_encoders": ["h264_qsv"]}, True)
+    assert qsv[1] == "h264_qsv" and qsv[-1] == "nv12"
+    nvenc_first = v._get_codec_params({"video_codec": "Automático", "available_encoders": ["h264_amf", "h264_nvenc"]}, True)
+    assert nvenc_first[1] == "h264_nvenc"
+    cpu = v._get_codec_params({"video_codec": "CPU (libx264)", "available_encoders": ["h264_amf"]}, True)
+    assert cpu[1] == "libx264"
+
+
+def test_get_codec_params_limits_cpu_threads_in_batch():
+    params = {"video_codec": "Automático", "available_encoders": [], "encoder_threads": 3}
+    out = v._get_codec_params(params, True)
+    assert out[out.index("-threads") + 1] == "3"
+    gpu = v._get_codec_params({**params, "available_encoders": ["h264_nvenc"]}, True)
+    assert "-threads" not in gpu
+
+
 def test_build_subtitle_style_string():
     style = {
         "fontsize": 24,
@@ -39,6 +87,10 @@ def test_build_subtitle_style_string():
     assert "Alignment=2" in result
 
 
+def test_escape_subtitle_path():
+    assert v._escape_subtitle_path("/legendas/C:/video.srt") == "/legendas/C\\:/video.srt"
+
+
 def test_probe_media_properties(tmp_path, monkeypatch):
     ffmpeg = tmp_path / "ffmpeg"
     ffmpeg.write_text("")
@@ -54,6 +106,38 @@ def test_probe_media_properties(tmp_path, monkeypatch):
     result = v._probe_media_properties(str(media), str(ffmpeg))
     assert result == {"streams": []}
 
+    def fake_run_bytes(cmd, **kwargs):
+        assert "text" not in kwargs
+        return subprocess.CompletedProcess(cmd, 0, stdout=b'{"format": {"duration": "1.5"}}')
+
+    v._run_ffprobe.cache_clear()
+    monkeypatch.setattr(subprocess, "run", fake_run_bytes)
+    result = v._probe_media_properties(str(media), str(ffmpeg))
+    assert result == {"format": {"duration": "1.5"}}
+
+
+def test_probe_media_properties_is_cached_per_file_version(tmp_path, monkeypatch):
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text("")
+    (tmp_path / "ffprobe").write_text("")
+    media = tmp_path / "input.mp4"
+    media.write_text("dummy")
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout=b'{"streams": []}')
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    first = v._probe_media_properties(str(media), str(ffmpeg))
+    first["streams"].append("mutated")
+    assert v._probe_media_properties(str(media), str(ffmpeg)) == {"streams": []}
+    assert len(calls) == 1
+
+    media.write_text("changed content")
+    v._probe_media_properties(str(media), str(ffmpeg))
+    assert len(calls) == 2
+
 
 def test_probe_media_properties_no_ffprobe(tmp_path):
     ffmpeg = tmp_path / "ffmpeg"
@@ -62,3 +146,218 @@ def test_probe_media_properties_no_ffprobe(tmp_path):
     media.write_text("dummy")
 
     assert v._probe_media_properties(str(media), str(ffmpeg)) is None
+
+
+def test_run_batch_processing_runs_every_item(tmp_path, monkeypatch):
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    video_dir = tmp_path / "videos"
+    video_dir.mkdir()
+    (video_dir / "clip.mp4").write_text("")
+    for name in ("a_en.mp3", "b_pt.mp3", "c.mp3"):
+        (audio_dir / name).write_text("")
+
+    processed = []
+    styles = []
+
+    def fake_single(item_params, progress_queue, cancel_event, progress_callback=None):
+        processed.append(item_params["output_filename_single"])
+        styles.append(item_params["_subtitle_style_cached"])
+        progress_callback(1.0)
+        return True
+
+    monkeypatch.setattr(v, "_run_single_item_processing", fake_single)
+    progress_queue = v.Queue()
+    params = {"batch_audio_folder": str(audio_dir), "batch_video_folder": str(video_dir), "batch_concurrency": 2,
+              "subtitle_style": {"fontsize": 30}}
+    assert v._run_batch_processing(params, progress_queue, v.threading.Event(), str(tmp_path))
+    assert sorted(processed) == ["video_final_a_en.mp4", "video_final_b_pt.mp4", "video_final_c.mp4"]
+    assert styles == [v._build_subtitle_style_string({"fontsize": 30})] * 3
+
+    messages = []
+    while not progress_queue.empty():
+        messages.append(progress_queue.get_nowait())
+    assert messages[-1] == ("batch_progress", 1.0)
+
+
+def test_run_batch_processing_item_bar_follows_one_item_when_parallel(tmp_path, monkeypatch):
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    video_dir = tmp_path / "videos"
+    video_dir.mkdir()
+    (video_dir / "clip.mp4").write_text("")
+    for name in ("a.mp3", "b.mp3"):
+        (audio_dir / name).write_text("")
+    both_running = v.threading.Barrier(2, timeout=5)
+
+    def fake_single(item_params, progress_queue, cancel_event, progress_callback=None):
+        # Os dois itens reportam enquanto ambos estão em andamento.
+        both_running.wait()
+        progress_callback(0.1 if item_params["output_filename_single"] == "video_final_a.mp4" else 0.9)
+        both_running.wait()
+        return True
+
+    monkeypatch.setattr(v, "_run_single_item_processing", fake_single)
+    progress_queue = v.Queue()
+    params = {"batch_audio_folder": str(audio_dir), "batch_video_folder": str(video_dir), "batch_concurrency": 2}
+    assert v._run_batch_processing(params, progress_queue, v.threading.Event(), str(tmp_path))
+
+    messages = []
+    while not progress_queue.empty():
+        messages.append(progress_queue.get_nowait())
+    assert [m for m in messages if m[0] == "progress"] == [("progress", 0.1)]
+    batch = [m[1] for m in messages if m[0] == "batch_progress"]
+    assert batch[0] == 0.0 and batch[-1] == 1.0 and max(batch[1:-1]) == pytest.approx(0.5)
+
+
+def test_run_batch_processing_prefetches_probes_of_later_items(tmp_path, monkeypatch):
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    video_dir = tmp_path / "videos"
+    video_dir.mkdir()
+    (video_dir / "clip.mp4").write_text("")
+    for name in ("a.mp3", "b.mp3", "c.mp3"):
+        (audio_dir / name).write_text("")
+    probed = []
+    all_probed = v.threading.Event()
+
+    def fake_probe(path, ffmpeg_path):
+        probed.append(path)
+        if len(probed) == 3: all_probed.set()
+
+    monkeypatch.setattr(v, "_probe_media_properties", fake_probe)
+    # Os itens só terminam depois das sondagens, como numa codificação real mais lenta que o ffprobe.
+    monkeypatch.setattr(v, "_run_single_item_processing", lambda item_params, *args, **kwargs: all_probed.wait(1))
+    params = {"ffmpeg_path": "ffmpeg", "batch_audio_folder": str(audio_dir), "batch_video_folder": str(video_dir),
+              "batch_concurrency": 1}
+    assert v._run_batch_processing(params, v.Queue(), v.threading.Event(), str(tmp_path))
+    # O primeiro item sonda os próprios arquivos; os seguintes já vêm sondados (o vídeo uma vez só).
+    assert sorted(probed) == sorted([str(audio_dir / "b.mp3"), str(audio_dir / "c.mp3"), str(video_dir / "clip.mp4")])
+
+
+def test_single_item_stream_copies_when_nothing_changes(tmp_path, monkeypatch, recorded_commands):
+    media = tmp_path / "input.mp4"
+    media.write_text("dummy")
+    props = {"streams": [{"codec_type": "video", "width": 1920, "height": 1080}], "format": {"duration": "10"}}
+    monkeypatch.setattr(v, "_probe_media_properties", lambda path, ffmpeg_path: props)
+    params = {
+        "ffmpeg_path": "ffmpeg",
+        "media_path_single": str(media),
+        "output_folder": str(tmp_path),
+        "output_filename_single": "out.mp4",
+        "resolution": "1080p (1920x1080)",
+    }
+    assert v._run_single_item_processing(params, v.Queue(), v.threading.Event())
+    cmd, = recorded_commands
+    assert "-filter_complex" not in cmd
+    assert cmd[cmd.index("-c:v") + 1] == "copy"
+
+
+@pytest.mark.parametrize("codec, volume, expected", [("aac", 0, "copy"), ("aac", 3, "aac"), ("mp3", 0, "aac")])
+def test_single_item_copies_untouched_aac_narration(tmp_path, monkeypatch, recorded_commands, codec, volume, expected):
+    media = tmp_path / "input.mp4"
+    media.write_text("dummy")
+    narration = tmp_path / "narration.m4a"
+    narration.write_text("audio")
+    video_props = {"streams": [{"codec_type": "video", "width": 1920, "height": 1080}], "format": {"duration": "10"}}
+    audio_props = {"streams": [{"codec_type": "audio", "codec_name": codec}], "format": {"duration": "8"}}
+    monkeypatch.setattr(v, "_probe_media_properties", lambda path, ffmpeg_path: audio_props if path == str(narration) else video_props)
+    params = {
+        "ffmpeg_path": "ffmpeg",
+        "media_path_single": str(media),
+        "narration_file_single": str(narration),
+        "narration_volume": volume,
+        "output_folder": str(tmp_path),
+        "output_filename_single": "out.mp4",
+        "resolution": "1080p (1920x1080)",
+    }
+    assert v._run_single_item_processing(params, v.Queue(), v.threading.Event())
+    cmd, = recorded_commands
+    assert cmd[cmd.index("-c:a") + 1] == expected
+    assert "-filter_complex" not in cmd and "1:a:0" in cmd
+    assert ("-af" in cmd) == bool(volume)
+
+
+@posix_only
+def test_execute_ffmpeg_reports_progress_across_chunks(fake_ffmpeg):
+    fake = fake_ffmpeg(
+        "for i in 1 2 3 4; do printf 'out_time_'; sleep 0.02; printf 'ms=%d000000\\n' $i; echo \"log $i\" >&2; done\n"
+        "exit 1\n"
+    )
+    seen = []
+    progress_queue = v.Queue()
+    assert not v._execute_ffmpeg([fake], 4.0, seen.append, v.threading.Event(), "t", progress_queue)
+    assert seen == [0.25, 0.5, 0.75, 1.0]
+    messages = []
+    while not progress_queue.empty():
+        messages.append(progress_queue.get_nowait())
+    assert messages[-1][2] == "error" and "log 4" in messages[-1][1]
+
+
+@posix_only
+def test_execute_ffmpeg_reads_output_until_eof(fake_ffmpeg):
+    fake = fake_ffmpeg("printf 'out_time_ms=2000000\\nprogress=end\\n'\nexit 0\n")
+    seen = []
+    assert v._execute_ffmpeg([fake], 2.0, seen.append, v.threading.Event(), "t", v.Queue())
+    # O último bloco chega depois do processo sair e ainda assim conta.
+    assert seen[0] == 1.0
+
+
+@posix_only
+def test_execute_ffmpeg_cancel_unblocks_the_read(fake_ffmpeg):
+    fake = fake_ffmpeg("exec sleep 30\n")
+    cancel_event = v.threading.Event()
+    v.threading.Timer(0.2, cancel_event.set).start()
+    started = v.time.monotonic()
+    assert not v._execute_ffmpeg([fake], 30.0, lambda p: None, cancel_event, "t", v.Queue())
+    assert v.time.monotonic() - started < 5
+
+
+@posix_only
+def test_execute_ffmpeg_kills_ffmpeg_that_hangs_after_closing_stdout(fake_ffmpeg, monkeypatch):
+    fake = fake_ffmpeg("exec 1>&-\nexec sleep 30\n")
+    monkeypatch.setattr(v, "_EXIT_TIMEOUT", 0.2)
+    started = v.time.monotonic()
+    assert not v._execute_ffmpeg([fake], 30.0, lambda p: None, v.threading.Event(), "t", v.Queue())
+    assert v.time.monotonic() - started < 5
+    assert not v.process_manager.active_processes
+
+
+@posix_only
+def test_execute_ffmpeg_skips_unchanged_progress(fake_ffmpeg):
+    fake = fake_ffmpeg("for t in 1000000 1000100 1000200 2000000; do printf 'out_time_ms=%d\\n' $t; sleep 0.02; done\n")
+    seen = []
+    assert v._execute_ffmpeg([fake], 4.0, seen.append, v.threading.Event(), "t", v.Queue())
+    assert seen == [0.25, 0.5, 1.0]
+
+
+def test_slideshow_is_encoded_in_a_single_pass(tmp_path, monkeypatch, recorded_commands):
+    images = tmp_path / "imgs"
+    images.mkdir()
+    for name in ("a.png", "b.jpg"):
+        (images / name).write_text("img")
+    narration = tmp_path / "narration.mp3"
+    narration.write_text("audio")
+    monkeypatch.setattr(v, "_probe_media_properties", lambda path, ffmpeg_path: {"format": {"duration": "8"}})
+    params = {
+        "ffmpeg_path": "ffmpeg",
+        "media_path_single": str(images),
+        "narration_file_single": str(narration),
+        "output_folder": str(tmp_path),
+        "output_filename_single": "out.mp4",
+        "resolution": "720p (1280x720)",
+        "image_duration": 5,
+        "slideshow_transition": "fade",
+        "slideshow_motion": "Nenhum",
+        "narration_volume": -2,
+        "video_codec": "CPU (libx264)",
+        "available_encoders": [],
+    }
+    assert v._run_slideshow_processing(params, v.Queue(), v.threading.Event(), str(tmp_path))
+    cmd, = recorded_commands
+    assert cmd.count("-i") == 3
+    assert "xfade=transition=fade" in cmd[cmd.index("-filter_complex") + 1]
+    assert cmd[cmd.index("-af") + 1] == "volume=-2dB"
+    maps = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"]
+    assert maps == ["2:a:0", "[x1]"]
+    assert cmd[cmd.index("-c:v") + 1] == "libx264"
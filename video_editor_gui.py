@@ -3,25 +3,29 @@ from ttkbootstrap.constants import *
 from ttkbootstrap.tooltip import ToolTip
 from ttkbootstrap.dialogs import Messagebox
 import tkinter as tk
-import tkinter.filedialog
-import tkinter.colorchooser
 import os
+import stat
+import shutil
+import functools
 import subprocess
 import threading
+import time
 import platform
 import queue
 import re
 import datetime
-import json
 import logging
 import logging.handlers
-import urllib.request
-import zipfile
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Optional, Callable
 from tkinter import font as tkFont
 from pathlib import Path
 
+from config_manager import (
+    ConfigManager, RESOLUTIONS, SUBTITLE_POSITIONS,
+    SLIDESHOW_TRANSITIONS, SLIDESHOW_MOTIONS,
+)
+
 try:
     import video_processing_logic
 except ImportError:
@@ -31,128 +35,223 @@ except ImportError:
 # --- Constantes ---
 APP_NAME = "Kyle Video Editor v4.9"
 DEFAULT_GEOMETRY = "1200x850"
-CONFIG_FILE = "video_editor_config.json"
-SUPPORTED_NARRATION_FT = [("Arquivos de Áudio", "*.mp3 *.wav *.aac *.ogg *.flac"), ("Todos os arquivos", "*.*")]
+SUPPORTED_NARRATION_FT = (("Arquivos de Áudio", "*.mp3 *.wav *.aac *.ogg *.flac"), ("Todos os arquivos", "*.*"))
 SUPPORTED_MUSIC_FT = SUPPORTED_NARRATION_FT
-SUPPORTED_SUBTITLE_FT = [("Arquivos de Legenda SRT", "*.srt"), ("Todos os arquivos", "*.*")]
-SUPPORTED_VIDEO_FT = [("Arquivos de Vídeo", "*.mp4 *.mov *.avi *.mkv"), ("Todos os arquivos", "*.*")]
-SUPPORTED_IMAGE_FT = [("Arquivos de Imagem", "*.jpg *.jpeg *.png *.bmp *.webp"), ("Todos os arquivos", "*.*")]
-SUPPORTED_FONT_FT = [("Arquivos de Fonte", "*.ttf *.otf"), ("Todos os arquivos", "*.*")]
-
-RESOLUTIONS = ["1080p (1920x1080)", "720p (1280x720)", "Vertical (1080x1920)", "480p (854x480)"]
-SUBTITLE_POSITIONS = {
-    "Inferior Central": 2, "Inferior Esquerda": 1, "Inferior Direita": 3,
-    "Meio Central": 5, "Meio Esquerda": 4, "Meio Direita": 6,
-    "Superior Central": 8, "Superior Esquerda": 7, "Superior Direita": 9
+SUPPORTED_SUBTITLE_FT = (("Arquivos de Legenda SRT", "*.srt"), ("Todos os arquivos", "*.*"))
+SUPPORTED_VIDEO_FT = (("Arquivos de Vídeo", "*.mp4 *.mov *.avi *.mkv"), ("Todos os arquivos", "*.*"))
+SUPPORTED_IMAGE_FT = (("Arquivos de Imagem", "*.jpg *.jpeg *.png *.bmp *.webp"), ("Todos os arquivos", "*.*"))
+SUPPORTED_FONT_FT = (("Arquivos de Fonte", "*.ttf *.otf"), ("Todos os arquivos", "*.*"))
+# Encoders de hardware reconhecidos, com o rótulo exibido no seletor de codificador.
+HARDWARE_ENCODERS = {
+    "h264_nvenc": "GPU (NVENC H.264)", "hevc_nvenc": "GPU (NVENC HEVC)",
+    "h264_qsv": "GPU (Intel QSV)", "h264_amf": "GPU (AMD AMF)",
+    "h264_videotoolbox": "GPU (VideoToolbox)",
+}
+# Limite de cada codificação de teste de um encoder de hardware (as tentativas rodam em paralelo).
+ENCODER_TRIAL_TIMEOUT = 3
+STATUS_LOG_MAX_LINES = 2000
+# Segundos em que um os.stat de caminho informado na UI é reaproveitado.
+STAT_CACHE_TTL = 0.5
+# Caminhos inexistentes ficam lembrados por mais tempo (até o campo ser alterado).
+STAT_MISSING_TTL = 5.0
+QUEUE_SAFETY_TICK_MS = 1000
+# Variáveis cujo parâmetro em video_processing_logic não segue o nome do atributo.
+PARAM_KEY_OVERRIDES = {
+    'transition_var': 'slideshow_transition', 'motion_var': 'slideshow_motion',
+    'batch_video_parent_folder': 'batch_video_folder',
 }
-SLIDESHOW_TRANSITIONS = ["fade", "wipeleft", "wiperight", "wipeup", "wipedown", "slideleft", "slideright", "slideup", "slidedown", "circlecrop", "rectcrop", "distance", "fadegrays", "radial", "diagtl", "diagtr", "diagbl", "diagbr", "hlslice", "hrslice", "vuslice", "vdslice"]
-SLIDESHOW_MOTIONS = ["Nenhum", "Zoom In", "Zoom Out", "Pan Esquerda", "Pan Direita", "Aleatório"]
+FFMPEG_DOWNLOAD_CHUNK = 1 << 20
+FFMPEG_DOWNLOAD_SPOOL_MAX = 128 * 1024 * 1024
+FFMPEG_DOWNLOAD_ATTEMPTS = 3
+# Únicos membros do zip de builds do FFmpeg que o instalador extrai.
+FFMPEG_ZIP_MEMBERS = ("/bin/ffmpeg.exe", "/bin/ffprobe.exe", "/LICENSE")
+
+# (relx, rely, anchor) do preview para cada código de alinhamento ASS.
+_POSITION_LAYOUT = {
+    1: (0.05, 0.85, "w"), 2: (0.5, 0.85, "center"), 3: (0.95, 0.85, "e"),
+    4: (0.05, 0.5, "w"), 5: (0.5, 0.5, "center"), 6: (0.95, 0.5, "e"),
+    7: (0.05, 0.15, "w"), 8: (0.5, 0.15, "center"), 9: (0.95, 0.15, "e"),
+}
+_OUTLINE_OFFSETS = ((-2, -2), (2, -2), (2, 2), (-2, 2))
 
 
 # --- Logger Global ---
 logger = logging.getLogger()
 
 
-class ConfigManager:
-    """Gerencia o carregamento e salvamento da configuração do aplicativo."""
-    @staticmethod
-    def load_config() -> Dict[str, Any]:
-        default_config = {
-            'ffmpeg_path': '', 'output_folder': '', 'last_video_folder': '',
-            'last_audio_folder': '', 'last_image_folder': '', 'last_srt_folder': '',
-            'video_codec': 'Automático', 'resolution': RESOLUTIONS[0],
-            'narration_volume': 0, 'music_volume': -15, 'subtitle_fontsize': 28,
-            'subtitle_textcolor': '#FFFFFF', 'subtitle_outlinecolor': '#000000',
-            'subtitle_position': list(SUBTITLE_POSITIONS.keys())[0], 'subtitle_bold': True,
-            'subtitle_italic': False, 'subtitle_font_file': '',
-            'image_duration': 5,
-            'slideshow_transition': SLIDESHOW_TRANSITIONS[0],
-            'slideshow_motion': SLIDESHOW_MOTIONS[1],
-        }
-        try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    file_content = f.read()
-                    if file_content:
-                        saved_config = json.loads(file_content)
-                        default_config.update(saved_config)
-        except Exception as e:
-            logger.warning(f"Não foi possível carregar o arquivo de configuração: {e}")
-        return default_config
-
-    @staticmethod
-    def save_config(config: Dict[str, Any]) -> None:
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Erro ao salvar o arquivo de configuração: {e}")
-
-
 class FFmpegManager:
     """Lida com a descoberta e instalação do FFmpeg."""
+    # Encoders detectados por (caminho, mtime, tamanho) do executável; só sucessos entram.
+    _encoders_cache: Dict[Tuple[str, int, int], List[str]] = {}
+    # O cache é preenchido pela thread de tarefas e lido pela UI ao salvar a configuração.
+    _encoders_lock = threading.Lock()
+
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def find_executable() -> Optional[str]:
-        executable = "ffmpeg.exe" if platform.system() == "Windows" else "ffmpeg"
-        for path_dir in os.environ.get("PATH", "").split(os.pathsep):
-            potential_path = os.path.join(path_dir, executable)
-            if os.path.isfile(potential_path) and os.access(potential_path, os.X_OK):
-                return potential_path
-        return None
+        # shutil.which já trata PATHEXT no Windows e a permissão de execução.
+        return shutil.which("ffmpeg")
 
     @staticmethod
     def check_encoders(ffmpeg_path: str) -> List[str]:
         encoders_found = ["libx264"]
-        if not ffmpeg_path or not os.path.isfile(ffmpeg_path):
+        if not ffmpeg_path:
             return encoders_found
+        try:
+            st = os.stat(ffmpeg_path)
+        except OSError:
+            return encoders_found
+        if not stat.S_ISREG(st.st_mode):
+            return encoders_found
+        cache_key = (ffmpeg_path, st.st_mtime_ns, st.st_size)
+        with FFmpegManager._encoders_lock:
+            cached = FFmpegManager._encoders_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
         try:
             creation_flags = subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
-            result = subprocess.run(
-                [ffmpeg_path, '-encoders'], capture_output=True, text=True, check=True, timeout=10,
+            cmd = [ffmpeg_path, '-encoders']
+            process = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
                 creationflags=creation_flags, encoding='utf-8', errors='ignore'
             )
-            if "h264_nvenc" in result.stdout: encoders_found.append("h264_nvenc")
-            if "hevc_nvenc" in result.stdout: encoders_found.append("hevc_nvenc")
+            # Lê a lista linha a linha. Depois do separador "------" os encoders de vídeo
+            # (flags "V.....") vêm primeiro; o FFmpeg é encerrado assim que essa seção
+            # termina, sem esperar as centenas de linhas de áudio e legendas.
+            watchdog = threading.Timer(10, process.kill)
+            watchdog.start()
+            found = set()
+            in_list = stopped_early = False
+            try:
+                for line in process.stdout:
+                    fields = line.split()
+                    if not in_list:
+                        in_list = fields[:1] == ["------"]
+                        continue
+                    if not fields or not fields[0].startswith("V"):
+                        stopped_early = True
+                        break
+                    if len(fields) > 1 and fields[1] in HARDWARE_ENCODERS: found.add(fields[1])
+            finally:
+                if stopped_early and process.poll() is None: process.kill()
+                process.stdout.close()
+                process.wait()
+                watchdog.cancel()
+            if not stopped_early and process.returncode != 0:
+                raise subprocess.CalledProcessError(process.returncode, cmd)
+            # Os builds comuns do FFmpeg listam encoders de todos os fabricantes; só
+            # entram os que conseguem codificar um quadro neste computador. As
+            # tentativas rodam em paralelo para não prender a fila de tarefas da UI.
+            hardware = [name for name in HARDWARE_ENCODERS if name in found]
+            if hardware:
+                with ThreadPoolExecutor(max_workers=len(hardware), thread_name_prefix="encoder-trial") as pool:
+                    works = list(pool.map(lambda name: FFmpegManager._encoder_works(ffmpeg_path, name), hardware))
+                encoders_found.extend(name for name, ok in zip(hardware, works) if ok)
             logger.info(f"Encoders FFmpeg detectados: {encoders_found}")
+            with FFmpegManager._encoders_lock:
+                FFmpegManager._encoders_cache[cache_key] = list(encoders_found)
         except Exception as e:
             logger.warning(f"Falha ao verificar os encoders do FFmpeg: {e}")
         return encoders_found
 
+    @staticmethod
+    def _encoder_works(ffmpeg_path: str, encoder: str) -> bool:
+        creation_flags = subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
+        cmd = [ffmpeg_path, "-hide_banner", "-v", "error", "-f", "lavfi", "-i", "color=black:s=256x256:d=0.1",
+               "-frames:v", "1", "-c:v", encoder, "-f", "null", "-"]
+        try:
+            return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=ENCODER_TRIAL_TIMEOUT, creationflags=creation_flags).returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+
+    @staticmethod
+    def seed_encoders_cache(entries: Dict[str, List[str]]) -> None:
+        """Carrega o cache salvo na configuração (chaves "caminho|mtime_ns|tamanho")."""
+        for key, encoders in entries.items():
+            try:
+                path, mtime_ns, size = key.rsplit("|", 2)
+                cache_key = (path, int(mtime_ns), int(size))
+            except (ValueError, TypeError):
+                continue
+            with FFmpegManager._encoders_lock:
+                FFmpegManager._encoders_cache[cache_key] = list(encoders)
+
+    @staticmethod
+    def dump_encoders_cache(ffmpeg_path: str) -> Dict[str, List[str]]:
+        """Entradas do executável informado, no formato de seed_encoders_cache."""
+        with FFmpegManager._encoders_lock:
+            entries = list(FFmpegManager._encoders_cache.items())
+        return {f"{path}|{mtime_ns}|{size}": list(encoders)
+                for (path, mtime_ns, size), encoders in entries
+                if path == ffmpeg_path}
+
+class NotifyingQueue(queue.Queue):
+    """Fila que chama `notify` após cada put, para a UI drenar sem polling."""
+    def __init__(self, notify: Callable[[], None]):
+        super().__init__()
+        self._notify = notify
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        self._notify()
+
 class SubtitlePreview(tk.Canvas):
     """Um widget personalizado para fornecer uma visualização realista da legenda."""
     def __init__(self, parent, **kwargs):
         super().__init__(parent, bg="#1a1a1a", **kwargs)
-        self.text_id = self.create_text(0, 0, text="Subtitle Preview", fill="white", anchor="center")
-        self.outline_ids = [self.create_text(0, 0, text="Subtitle Preview", fill="black", anchor="center") for _ in range(4)]
-        self.tag_lower(self.outline_ids)
+        # As 4 cópias de contorno compartilham a tag "outline" e todos os itens a
+        # tag "subtitle", permitindo atualizá-los com um único itemconfig.
+        self.text_id = self.create_text(0, 0, text="Subtitle Preview", fill="white", anchor="center", tags=("subtitle",))
+        self.outline_ids = [self.create_text(0, 0, text="Subtitle Preview", fill="black", anchor="center", tags=("subtitle", "outline")) for _ in range(4)]
+        self.tag_lower("outline")
         self.tag_raise(self.text_id)
         self.bind("<Configure>", self._on_resize)
-        self._font = ("Arial", 28, "bold")
+        # Fonte nomeada única: reconfigurá-la atualiza os itens sem novo itemconfig.
+        self.preview_font = tkFont.Font(root=self, family="Arial", size=28, weight="bold")
+        self._font = self.preview_font
+        self._position_key = "Inferior Central"
+        self._last_style: Optional[Tuple] = None
+        self._last_layout: Optional[Tuple] = None
+        self._last_font: Optional[Tuple] = None
+
+    def configure_font(self, size: int, weight: str, slant: str):
+        # Reconfigurar a fonte nomeada refaz o layout de todos os itens de texto;
+        # só vale a pena quando algo realmente mudou.
+        font = (size, weight, slant)
+        if font == self._last_font: return
+        self._last_font = font
+        self.preview_font.configure(size=size, weight=weight, slant=slant)
 
     def _on_resize(self, event):
-        self.update_preview()
+        # Redimensionar só altera a posição; o estilo aplicado continua válido.
+        self._apply_layout()
 
     def update_preview(self, text="Subtitle Preview", font_config=None, text_color="#FFFFFF", outline_color="#000000", position_key="Inferior Central"):
         if font_config:
             self._font = font_config
+        self._apply_style(text, text_color, outline_color)
+        self._position_key = position_key
+        self._apply_layout()
+
+    def _apply_style(self, text, text_color, outline_color):
+        style = (text, str(self._font), text_color, outline_color)
+        if style == self._last_style: return
+        self._last_style = style
         self.itemconfig(self.text_id, text=text, font=self._font, fill=text_color)
-        for i in range(4):
-            self.itemconfig(self.outline_ids[i], text=text, font=self._font, fill=outline_color)
+        self.itemconfig("outline", text=text, font=self._font, fill=outline_color)
+
+    def _apply_layout(self):
         width, height = self.winfo_width(), self.winfo_height()
-        pos = SUBTITLE_POSITIONS.get(position_key, 2)
-        if pos in [7, 8, 9]: rely = 0.15
-        elif pos in [4, 5, 6]: rely = 0.5
-        else: rely = 0.85
-        if pos in [1, 4, 7]: relx, anchor = 0.05, "w"
-        elif pos in [3, 6, 9]: relx, anchor = 0.95, "e"
-        else: relx, anchor = 0.5, "center"
+        pos = SUBTITLE_POSITIONS.get(self._position_key, 2)
+        layout = (width, height, pos)
+        if layout == self._last_layout: return
+        self._last_layout = layout
+        relx, rely, anchor = _POSITION_LAYOUT.get(pos, _POSITION_LAYOUT[2])
         x, y = width * relx, height * rely
         self.coords(self.text_id, x, y)
-        self.itemconfig(self.text_id, anchor=anchor)
-        offsets = [(-2, -2), (2, -2), (2, 2), (-2, 2)]
-        for i, (dx, dy) in enumerate(offsets):
-            self.coords(self.outline_ids[i], x + dx, y + dy)
-            self.itemconfig(self.outline_ids[i], anchor=anchor)
+        for outline_id, (dx, dy) in zip(self.outline_ids, _OUTLINE_OFFSETS):
+            self.coords(outline_id, x + dx, y + dy)
+        self.itemconfig("subtitle", anchor=anchor)
 
 class VideoEditorApp:
     """A classe principal do aplicativo."""
@@ -178,11 +277,12 @@ class VideoEditorApp:
         logger.info("Configuração da UI concluída.")
 
     def _setup_logging(self):
-        logger.setLevel(logging.DEBUG)
+        # DEBUG só quando solicitado: as linhas de progresso do FFmpeg são muitas.
+        logger.setLevel(logging.DEBUG if os.environ.get("KYLE_DEBUG") else logging.INFO)
         log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(funcName)s] - %(message)s')
         try:
             log_file = "video_editor_app.log"
-            handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=3, encoding='utf-8')
+            handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=3, encoding='utf-8', delay=True)
             handler.setFormatter(log_formatter)
             logger.addHandler(handler)
             logger.info(f"Log configurado. Arquivo de log: {os.path.abspath(log_file)}")
@@ -217,13 +317,51 @@ class VideoEditorApp:
         self.subtitle_position_var = ttk.StringVar(value=self.config.get('subtitle_position', list(SUBTITLE_POSITIONS.keys())[0]))
         self.subtitle_bold_var = ttk.BooleanVar(value=self.config.get('subtitle_bold', True))
         self.subtitle_italic_var = ttk.BooleanVar(value=self.config.get('subtitle_italic', False))
+        # (chave do parâmetro, variável) de todas as variáveis Tk, para _gather_processing_params.
+        # A chave é o nome do atributo sem "_var", salvo onde o processamento espera outro nome.
+        self._tk_vars = [(PARAM_KEY_OVERRIDES.get(name, name.removesuffix("_var")), var) for name, var in self.__dict__.items() if isinstance(var, tk.Variable)]
 
     def _init_state(self):
         self.is_processing = False
         self.cancel_requested = threading.Event()
-        self.progress_queue = queue.Queue()
-        self.thread_executor = ThreadPoolExecutor(max_workers=1)
+        # Cada put agenda um <<ProgressMsg>> (no máximo um pendente por vez) e a fila
+        # é drenada assim que o Tk processa o evento; nada acorda a UI quando ociosa.
+        self._drain_pending = threading.Event()
+        self._draining = False
+        self.progress_queue = NotifyingQueue(self._notify_queue)
+        self.root.bind("<<ProgressMsg>>", lambda e: self._drain_queue())
         self.available_encoders_cache: Optional[List[str]] = None
+        self._subtitle_update_pending = False
+        # O preview só é redesenhado com a aba de Legendas visível; mudanças feitas
+        # em outras abas ficam marcadas e são aplicadas quando ela for aberta.
+        self._preview_dirty = True
+        self._colors = self.root.style.colors
+        # Resultado de os.stat por caminho, válido por STAT_CACHE_TTL; a entrada é
+        # descartada assim que o campo correspondente é alterado.
+        self._stat_cache: Dict[str, Tuple[float, Optional[os.stat_result]]] = {}
+        for var in self.path_vars.values():
+            var.trace_add('write', functools.partial(self._forget_stat, var))
+        # Thread persistente para tarefas de fundo da UI (instalação, sondagens).
+        self._job_queue = queue.Queue()
+        threading.Thread(target=self._worker_loop, daemon=True, name="ui-jobs").start()
+        # Aquece o cache de encoders enquanto os widgets ainda estão sendo montados;
+        # a sondagem de post_init_setup depois encontra o resultado pronto.
+        # Com o resultado salvo da última execução o aquecimento nem inicia o FFmpeg,
+        # desde que o executável não tenha mudado.
+        FFmpegManager.seed_encoders_cache(self.config.get('encoder_cache') or {})
+        self._job_queue.put((self._warm_encoders_cache_job, (self.ffmpeg_path_var.get(),)))
+
+    def _warm_encoders_cache_job(self, configured_path: str):
+        FFmpegManager.check_encoders(configured_path or FFmpegManager.find_executable() or "")
+
+    def _worker_loop(self):
+        while True:
+            fn, args = self._job_queue.get()
+            try:
+                fn(*args)
+            except Exception as e:
+                logger.error(f"Erro em tarefa de fundo: {e}", exc_info=True)
+                self.progress_queue.put(("status", f"Erro em tarefa de fundo: {e}", "error"))
 
     def _create_widgets(self):
         self.root.columnconfigure(0, weight=1)
@@ -232,14 +370,40 @@ class VideoEditorApp:
         self.notebook = ttk.Notebook(self.root)
         self.notebook.grid(row=0, column=0, sticky="nsew", padx=10, pady=(10, 0))
 
+        # As abas de Áudio e Legendas só são montadas quando selecionadas pela
+        # primeira vez; as demais são usadas já na inicialização.
+        self._lazy_tab_builders: Dict[str, Any] = {}
+        # O mesmo vale para os quadros que só aparecem em um modo de operação: são
+        # criados na primeira vez que update_ui_for_media_type precisa exibi-los.
+        self._lazy_frame_builders: Dict[str, Any] = {}
         self._create_files_tab()
         self._create_video_tab()
-        self._create_audio_tab()
-        self._create_subtitle_tab()
+        self._add_lazy_tab(" 3. Áudio ", self._create_audio_tab)
+        self._subtitle_tab = self._add_lazy_tab(" 4. Legendas ", self._create_subtitle_tab)
         self._create_settings_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
         
         self._create_process_and_status_section(self.root)
 
+    def _add_lazy_tab(self, text, builder):
+        tab = ttk.Frame(self.notebook, padding=(20, 15))
+        self.notebook.add(tab, text=text)
+        tab.columnconfigure(0, weight=1)
+        self._lazy_tab_builders[str(tab)] = functools.partial(builder, tab)
+        return str(tab)
+
+    def _lazy_frame(self, name: str, build: bool):
+        builder = self._lazy_frame_builders.pop(name, None) if build else None
+        if builder: setattr(self, name, builder())
+        return getattr(self, name, None)
+
+    def _on_tab_changed(self, event=None):
+        current = self.notebook.select()
+        builder = self._lazy_tab_builders.pop(current, None)
+        if builder: builder()
+        if current == self._subtitle_tab and self._preview_dirty:
+            self.update_subtitle_preview_job()
+
     def _create_files_tab(self):
         tab = ttk.Frame(self.notebook, padding=(20, 15))
         self.notebook.add(tab, text=" 1. Arquivos ")
@@ -257,24 +421,21 @@ class VideoEditorApp:
         
         self.single_inputs_frame = ttk.Frame(input_section); self.single_inputs_frame.grid(row=0, column=0, sticky="ew"); self.single_inputs_frame.columnconfigure(0, weight=1)
         self.media_path_label_widget = self._create_file_input(self.single_inputs_frame, 0, "Mídia Principal:", 'media_single', self.select_media_single)
-        self._create_file_input(self.single_inputs_frame, 1, "Narração (Áudio):", 'narration_single', lambda: self.select_file('narration_single', "Selecione a Narração", SUPPORTED_NARRATION_FT))
-        self._create_file_input(self.single_inputs_frame, 2, "Legenda (SRT):", 'subtitle_single', lambda: self.select_file('subtitle_single', "Selecione a Legenda", SUPPORTED_SUBTITLE_FT))
+        self._create_file_input(self.single_inputs_frame, 1, "Narração (Áudio):", 'narration_single', functools.partial(self.select_file, 'narration_single', "Selecione a Narração", SUPPORTED_NARRATION_FT))
+        self._create_file_input(self.single_inputs_frame, 2, "Legenda (SRT):", 'subtitle_single', functools.partial(self.select_file, 'subtitle_single', "Selecione a Legenda", SUPPORTED_SUBTITLE_FT))
         
-        self.batch_inputs_frame = ttk.Frame(input_section); self.batch_inputs_frame.grid(row=0, column=0, sticky="ew"); self.batch_inputs_frame.columnconfigure(0, weight=1)
-        self._create_file_input(self.batch_inputs_frame, 0, "Pasta de Vídeos:", 'batch_video', lambda: self.select_folder('batch_video', "Selecione a Pasta de Vídeos"))
-        self._create_file_input(self.batch_inputs_frame, 1, "Pasta de Áudios:", 'batch_audio', lambda: self.select_folder('batch_audio', "Selecione a Pasta de Áudios"))
-        self._create_file_input(self.batch_inputs_frame, 2, "Pasta de Legendas:", 'batch_srt', lambda: self.select_folder('batch_srt', "Selecione a Pasta de Legendas"))
+        self._lazy_frame_builders['batch_inputs_frame'] = functools.partial(self._create_batch_inputs, input_section)
         
         music_section = ttk.LabelFrame(tab, text=" Música de Fundo (Opcional) ", padding=15)
         music_section.grid(row=2, column=0, sticky="ew", pady=(0, 15))
         music_section.columnconfigure(0, weight=1)
-        self.music_file_frame = self._create_file_input(music_section, 0, "Arquivo de Música:", 'music_single', lambda: self.select_file('music_single', "Selecione a Música", SUPPORTED_MUSIC_FT))
-        self.music_folder_frame = self._create_file_input(music_section, 0, "Pasta de Músicas:", 'music_folder', lambda: self.select_folder('music_folder', "Selecione a Pasta de Músicas"))
+        self.music_file_frame = self._create_file_input(music_section, 0, "Arquivo de Música:", 'music_single', functools.partial(self.select_file, 'music_single', "Selecione a Música", SUPPORTED_MUSIC_FT))
+        self._lazy_frame_builders['music_folder_frame'] = functools.partial(self._create_file_input, music_section, 1, "Pasta de Músicas:", 'music_folder', functools.partial(self.select_folder, 'music_folder', "Selecione a Pasta de Músicas"))
         
         output_section = ttk.LabelFrame(tab, text=" Arquivo de Saída ", padding=15)
         output_section.grid(row=3, column=0, sticky="ew")
         output_section.columnconfigure(0, weight=1)
-        self._create_file_input(output_section, 0, "Pasta de Saída:", 'output', lambda: self.select_folder('output', "Selecione a Pasta de Saída"))
+        self._create_file_input(output_section, 0, "Pasta de Saída:", 'output', functools.partial(self.select_folder, 'output', "Selecione a Pasta de Saída"))
         
         self.output_filename_frame = ttk.Frame(output_section)
         self.output_filename_frame.grid(row=1, column=0, sticky="ew", pady=4)
@@ -296,22 +457,30 @@ class VideoEditorApp:
         self.video_codec_combobox = ttk.Combobox(self.video_settings_section, textvariable=self.video_codec_var, state="readonly")
         self.video_codec_combobox.grid(row=1, column=1, sticky="ew")
         
-        self.slideshow_section = ttk.LabelFrame(tab, text=" Configurações de Slideshow ", padding=15)
-        self.slideshow_section.grid(row=1, column=0, sticky="ew")
-        self.slideshow_section.columnconfigure(1, weight=1)
-        ttk.Label(self.slideshow_section, text="Duração por Imagem (s):").grid(row=0, column=0, sticky="w", padx=(0,10), pady=5)
-        duration_frame = ttk.Frame(self.slideshow_section); duration_frame.grid(row=0, column=1, sticky="ew"); duration_frame.columnconfigure(0, weight=1)
+        self._lazy_frame_builders['slideshow_section'] = functools.partial(self._create_slideshow_section, tab)
+
+    def _create_batch_inputs(self, parent):
+        frame = ttk.Frame(parent); frame.grid(row=0, column=0, sticky="ew"); frame.columnconfigure(0, weight=1)
+        self._create_file_input(frame, 0, "Pasta de Vídeos:", 'batch_video', functools.partial(self.select_folder, 'batch_video', "Selecione a Pasta de Vídeos"))
+        self._create_file_input(frame, 1, "Pasta de Áudios:", 'batch_audio', functools.partial(self.select_folder, 'batch_audio', "Selecione a Pasta de Áudios"))
+        self._create_file_input(frame, 2, "Pasta de Legendas:", 'batch_srt', functools.partial(self.select_folder, 'batch_srt', "Selecione a Pasta de Legendas"))
+        return frame
+
+    def _create_slideshow_section(self, tab):
+        section = ttk.LabelFrame(tab, text=" Configurações de Slideshow ", padding=15)
+        section.grid(row=1, column=0, sticky="ew")
+        section.columnconfigure(1, weight=1)
+        ttk.Label(section, text="Duração por Imagem (s):").grid(row=0, column=0, sticky="w", padx=(0,10), pady=5)
+        duration_frame = ttk.Frame(section); duration_frame.grid(row=0, column=1, sticky="ew"); duration_frame.columnconfigure(0, weight=1)
         ttk.Scale(duration_frame, from_=1, to=30, variable=self.image_duration_var, orient=HORIZONTAL, command=lambda v: self.image_duration_var.set(int(float(v)))).grid(row=0, column=0, sticky="ew", padx=(0,10))
         ttk.Label(duration_frame, textvariable=self.image_duration_var, width=3).grid(row=0, column=1)
-        ttk.Label(self.slideshow_section, text="Transição:").grid(row=1, column=0, sticky="w", padx=(0,10), pady=5)
-        ttk.Combobox(self.slideshow_section, textvariable=self.transition_var, values=SLIDESHOW_TRANSITIONS, state="readonly").grid(row=1, column=1, sticky="ew")
-        ttk.Label(self.slideshow_section, text="Efeito de Movimento:").grid(row=2, column=0, sticky="w", padx=(0,10), pady=5)
-        ttk.Combobox(self.slideshow_section, textvariable=self.motion_var, values=SLIDESHOW_MOTIONS, state="readonly").grid(row=2, column=1, sticky="ew")
+        ttk.Label(section, text="Transição:").grid(row=1, column=0, sticky="w", padx=(0,10), pady=5)
+        ttk.Combobox(section, textvariable=self.transition_var, values=SLIDESHOW_TRANSITIONS, state="readonly").grid(row=1, column=1, sticky="ew")
+        ttk.Label(section, text="Efeito de Movimento:").grid(row=2, column=0, sticky="w", padx=(0,10), pady=5)
+        ttk.Combobox(section, textvariable=self.motion_var, values=SLIDESHOW_MOTIONS, state="readonly").grid(row=2, column=1, sticky="ew")
+        return section
 
-    def _create_audio_tab(self):
-        tab = ttk.Frame(self.notebook, padding=(20, 15))
-        self.notebook.add(tab, text=" 3. Áudio ")
-        tab.columnconfigure(0, weight=1)
+    def _create_audio_tab(self, tab):
         audio_settings_section = ttk.LabelFrame(tab, text=" Volumes ", padding=15)
         audio_settings_section.grid(row=0, column=0, sticky="ew")
         audio_settings_section.columnconfigure(1, weight=1)
@@ -335,10 +504,7 @@ class VideoEditorApp:
         ttk.Label(slider_frame, textvariable=display_var, width=7).grid(row=0, column=1)
         update_display(var.get())
 
-    def _create_subtitle_tab(self):
-        tab = ttk.Frame(self.notebook, padding=(20, 15))
-        self.notebook.add(tab, text=" 4. Legendas ")
-        tab.columnconfigure(0, weight=1)
+    def _create_subtitle_tab(self, tab):
         tab.rowconfigure(1, weight=1)
         
         settings_frame = ttk.LabelFrame(tab, text=" Estilo da Legenda ", padding=15)
@@ -362,7 +528,7 @@ class VideoEditorApp:
         ttk.Checkbutton(style_frame, text="Negrito", variable=self.subtitle_bold_var, bootstyle="round-toggle", command=self.on_subtitle_style_change).pack(side=LEFT, padx=(0, 10))
         ttk.Checkbutton(style_frame, text="Itálico", variable=self.subtitle_italic_var, bootstyle="round-toggle", command=self.on_subtitle_style_change).pack(side=LEFT)
         
-        font_frame = self._create_file_input(settings_frame, 3, "Arquivo de Fonte:", 'subtitle_font', lambda: self.select_file('subtitle_font', "Selecione a Fonte", SUPPORTED_FONT_FT))
+        font_frame = self._create_file_input(settings_frame, 3, "Arquivo de Fonte:", 'subtitle_font', functools.partial(self.select_file, 'subtitle_font', "Selecione a Fonte", SUPPORTED_FONT_FT))
         font_frame.grid(row=2, column=2, columnspan=2, sticky='ew', padx=(20, 0))
 
         preview_section = ttk.LabelFrame(tab, text=" Preview da Legenda ", padding=5)
@@ -442,15 +608,15 @@ class VideoEditorApp:
         log_frame.grid(row=1, column=0, sticky="nsew")
         log_frame.rowconfigure(0, weight=1)
         log_frame.columnconfigure(0, weight=1)
-        self.status_text = tk.Text(log_frame, height=8, wrap=WORD, font=('Consolas', 9), relief="flat", background=self.root.style.colors.bg)
+        self.status_text = tk.Text(log_frame, height=8, wrap=WORD, font=('Consolas', 9), relief="flat", background=self._colors.bg)
         scrollbar = ttk.Scrollbar(log_frame, orient=VERTICAL, command=self.status_text.yview, bootstyle="round")
         self.status_text.configure(yscrollcommand=scrollbar.set, state=DISABLED)
         self.status_text.grid(row=0, column=0, sticky="nsew")
         scrollbar.grid(row=0, column=1, sticky="ns")
-        self.status_text.tag_configure("error", foreground=self.root.style.colors.danger)
-        self.status_text.tag_configure("success", foreground=self.root.style.colors.success)
-        self.status_text.tag_configure("info", foreground=self.root.style.colors.info)
-        self.status_text.tag_configure("warning", foreground=self.root.style.colors.warning)
+        self.status_text.tag_configure("error", foreground=self._colors.danger)
+        self.status_text.tag_configure("success", foreground=self._colors.success)
+        self.status_text.tag_configure("info", foreground=self._colors.info)
+        self.status_text.tag_configure("warning", foreground=self._colors.warning)
 
     def _create_file_input(self, parent, row, label_text, var_key, command):
         frame = ttk.Frame(parent)
@@ -473,21 +639,31 @@ class VideoEditorApp:
         entry = ttk.Entry(frame, textvariable=variable, width=10)
         entry.pack(side=LEFT, fill=X, expand=True)
         entry.bind("<KeyRelease>", self.on_subtitle_style_change)
-        button = ttk.Button(frame, text="🎨", width=3, bootstyle="info-outline", command=lambda: self.select_color(variable))
+        button = ttk.Button(frame, text="🎨", width=3, bootstyle="info-outline", command=functools.partial(self.select_color, variable))
         button.pack(side=LEFT, padx=(5,0))
 
     def on_subtitle_style_change(self, event=None):
-        if hasattr(self, '_subtitle_update_job'): self.root.after_cancel(self._subtitle_update_job)
-        self._subtitle_update_job = self.root.after(100, self.update_subtitle_preview_job)
+        # Uma rajada de eventos (teclas, arraste do slider) vira um único redesenho
+        # assim que o Tk fica ocioso, sem o atraso fixo de um after().
+        if self._subtitle_update_pending: return
+        self._subtitle_update_pending = True
+        self.root.after_idle(self._run_subtitle_update)
+
+    def _run_subtitle_update(self):
+        self._subtitle_update_pending = False
+        self.update_subtitle_preview_job()
         
     def update_subtitle_preview_job(self):
-        if not hasattr(self, 'subtitle_preview'): return
+        if not hasattr(self, 'subtitle_preview') or self.notebook.select() != self._subtitle_tab:
+            self._preview_dirty = True
+            return
+        self._preview_dirty = False
         try:
             font_size = int(self.subtitle_fontsize_var.get())
             weight = "bold" if self.subtitle_bold_var.get() else "normal"
             slant = "italic" if self.subtitle_italic_var.get() else "roman"
-            font_tuple = (tkFont.Font(family="Arial", size=font_size, weight=weight, slant=slant))
-            self.subtitle_preview.update_preview(font_config=font_tuple, text_color=self.subtitle_textcolor_var.get(), outline_color=self.subtitle_outlinecolor_var.get(), position_key=self.subtitle_position_var.get())
+            self.subtitle_preview.configure_font(font_size, weight, slant)
+            self.subtitle_preview.update_preview(text_color=self.subtitle_textcolor_var.get(), outline_color=self.subtitle_outlinecolor_var.get(), position_key=self.subtitle_position_var.get())
         except (tk.TclError, ValueError) as e:
             logger.warning(f"Erro ao atualizar a pré-visualização da legenda: {e}")
 
@@ -496,37 +672,44 @@ class VideoEditorApp:
         is_batch = (mode == "batch")
         is_slideshow = (mode == "image_folder")
         
-        for frame, show in [(self.single_inputs_frame, not is_batch),
-                             (self.batch_inputs_frame, is_batch),
-                             (self.music_file_frame, not is_batch),
-                             (self.music_folder_frame, is_batch),
-                             (self.output_filename_frame, not is_batch),
-                             (self.batch_progress_frame, is_batch),
-                             (self.slideshow_section, is_slideshow)]:
-            frame.grid_remove()
+        for name, show in [('single_inputs_frame', not is_batch),
+                           ('batch_inputs_frame', is_batch),
+                           ('music_file_frame', not is_batch),
+                           ('music_folder_frame', is_batch),
+                           ('output_filename_frame', not is_batch),
+                           ('batch_progress_frame', is_batch),
+                           ('slideshow_section', is_slideshow)]:
+            frame = self._lazy_frame(name, build=show)
+            # Quadros ainda não criados não têm o que esconder; e só mexe no grid quando a
+            # visibilidade muda, pois remover e re-gridar sempre força um relayout inteiro.
+            if frame is None or show == bool(frame.winfo_manager()): continue
             if show: frame.grid()
+            else: frame.grid_remove()
 
         self.media_path_label_widget.winfo_children()[0].config(text="Pasta de Imagens:" if is_slideshow else "Arquivo de Vídeo:")
         self.notebook.tab(1, text="2. Slideshow" if is_slideshow else "2. Vídeo")
-        self.video_settings_section.grid()
 
     def select_media_single(self):
         if self.media_type.get() == "image_folder": self.select_folder('media_single', "Selecione a Pasta de Imagens")
         else: self.select_file('media_single', "Selecione o Arquivo de Vídeo", SUPPORTED_VIDEO_FT)
 
     def select_file(self, var_key, title, filetypes):
+        import tkinter.filedialog
         variable = self.path_vars[var_key]
-        last_dir = os.path.dirname(variable.get()) if variable.get() else self.config.get('output_folder')
+        current = variable.get()
+        last_dir = os.path.dirname(current) if current else self.config.get('output_folder', '')
         filepath = tkinter.filedialog.askopenfilename(title=title, filetypes=filetypes, initialdir=last_dir, parent=self.root)
         if filepath: variable.set(filepath)
     
     def select_folder(self, var_key, title):
+        import tkinter.filedialog
         variable = self.path_vars[var_key]
-        last_dir = variable.get() if variable.get() else self.config.get('output_folder')
+        last_dir = variable.get() or self.config.get('output_folder', '')
         folderpath = tkinter.filedialog.askdirectory(title=title, initialdir=last_dir, parent=self.root)
         if folderpath: variable.set(folderpath)
 
     def select_color(self, variable):
+        import tkinter.colorchooser
         color = tkinter.colorchooser.askcolor(title="Escolha uma cor", initialcolor=variable.get(), parent=self.root)
         if color and color[1]: variable.set(color[1].upper()); self.on_subtitle_style_change()
 
@@ -534,9 +717,39 @@ class VideoEditorApp:
         if platform.system() != "Windows": Messagebox.show_info("A instalação automática só é suportada no Windows.", "Info", parent=self.root); return
         if self.is_processing: Messagebox.show_warning("Aguarde o término do processamento atual.", "Aviso", parent=self.root); return
         if not Messagebox.yesno("Isso irá baixar o FFmpeg (aproximadamente 80MB) da internet. Deseja continuar?", "Instalar FFmpeg", parent=self.root): return
-        threading.Thread(target=self._installation_thread_worker, daemon=True).start()
+        self._job_queue.put((self._installation_thread_worker, ()))
+
+    def _download_ffmpeg_zip(self, url: str, spool):
+        import http.client
+        import urllib.request
+        downloaded = total_size = 0; last_pct = -1
+        for attempt in range(1, FFMPEG_DOWNLOAD_ATTEMPTS + 1):
+            # A partir da segunda tentativa pede só o que falta (Range) e continua no mesmo spool.
+            headers = {'Range': f'bytes={downloaded}-'} if downloaded else {}
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+                    if downloaded and response.status != 206:
+                        # O servidor ignorou o Range e mandou o arquivo inteiro de novo.
+                        spool.seek(0); spool.truncate(); downloaded = total_size = 0
+                    if not total_size: total_size = downloaded + int(response.headers.get('Content-Length', 0))
+                    while True:
+                        chunk = response.read(FFMPEG_DOWNLOAD_CHUNK)
+                        if not chunk: break
+                        spool.write(chunk); downloaded += len(chunk)
+                        pct = int((downloaded / total_size) * 100) if total_size > 0 else -1
+                        if pct > last_pct:
+                            self.progress_queue.put(("status", f"Baixando FFmpeg... {pct}%", "info")); last_pct = pct
+                if total_size and downloaded != total_size:
+                    raise IOError(f"download incompleto ({downloaded} de {total_size} bytes)")
+                return
+            except (OSError, http.client.HTTPException) as e:
+                if attempt == FFMPEG_DOWNLOAD_ATTEMPTS: raise
+                logger.warning(f"Falha no download do FFmpeg (tentativa {attempt}): {e}")
+                self.progress_queue.put(("status", f"Falha no download ({e}); retomando...", "warning"))
 
     def _installation_thread_worker(self):
+        import tempfile
+        import zipfile
         self.progress_queue.put(("status", "Iniciando download do FFmpeg...", "info"))
         try:
             ffmpeg_dir = Path.cwd() / "ffmpeg"; ffmpeg_dir.mkdir(exist_ok=True)
@@ -546,21 +759,23 @@ class VideoEditorApp:
                 self.ffmpeg_path_var.set(str(ffmpeg_exe_path.resolve())); return
 
             url = "https://www.gyan.dev/ffmpeg/builds/ffmpeg-release-essentials.zip"
-            zip_path = ffmpeg_dir / "ffmpeg.zip"
-            with urllib.request.urlopen(url) as response, open(zip_path, 'wb') as out_file:
-                 total_size = int(response.info().get('Content-Length', 0)); chunk_size = 8192; downloaded = 0
-                 while True:
-                     chunk = response.read(chunk_size)
-                     if not chunk: break
-                     out_file.write(chunk); downloaded += len(chunk)
-                     if total_size > 0: self.progress_queue.put(("status", f"Baixando FFmpeg... {int((downloaded/total_size)*100)}%", "info"))
-            self.progress_queue.put(("status", "Download completo. Extraindo...", "info"))
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref: zip_ref.extractall(ffmpeg_dir)
-            zip_path.unlink()
+            # O zip fica em memória (ou em um temporário, se passar do limite) e só os
+            # executáveis e a licença são extraídos; documentação e presets são ignorados.
+            with tempfile.SpooledTemporaryFile(max_size=FFMPEG_DOWNLOAD_SPOOL_MAX) as spool:
+                self._download_ffmpeg_zip(url, spool)
+                self.progress_queue.put(("status", "Download completo. Extraindo...", "info"))
+                spool.seek(0)
+                # Descarta a pasta de build do zip: os executáveis vão direto para
+                # ffmpeg/bin/, onde find_ffmpeg_on_startup os procura.
+                with zipfile.ZipFile(spool) as zip_ref:
+                    for info in zip_ref.infolist():
+                        if not info.filename.endswith(FFMPEG_ZIP_MEMBERS): continue
+                        target_dir = ffmpeg_dir / "bin" if "/bin/" in info.filename else ffmpeg_dir
+                        info.filename = os.path.basename(info.filename)
+                        zip_ref.extract(info, target_dir)
             
-            found_exe = next(ffmpeg_dir.glob("**/bin/ffmpeg.exe"), None)
-            if found_exe:
-                self.ffmpeg_path_var.set(str(found_exe.resolve()))
+            if ffmpeg_exe_path.is_file():
+                self.ffmpeg_path_var.set(str(ffmpeg_exe_path.resolve()))
                 self.progress_queue.put(("messagebox", "info", "Sucesso", "FFmpeg instalado com sucesso!"))
             else: raise FileNotFoundError("ffmpeg.exe não encontrado no arquivo baixado.")
         except Exception as e:
@@ -569,25 +784,25 @@ class VideoEditorApp:
         finally: self.progress_queue.put(("ffmpeg_check",))
 
     def find_ffmpeg_on_startup(self):
-        local_ffmpeg = next(Path.cwd().glob("ffmpeg/bin/ffmpeg.exe"), None)
+        # Ordem de prioridade: cópia local, caminho configurado, PATH. Cada etapa só
+        # roda se a anterior falhar (a busca no PATH é a mais cara).
+        local_ffmpeg = Path.cwd() / "ffmpeg" / "bin" / "ffmpeg.exe"
         configured_path = self.ffmpeg_path_var.get()
-        path_from_env = FFmpegManager.find_executable()
-
-        if local_ffmpeg and local_ffmpeg.is_file(): path_to_use = str(local_ffmpeg.resolve())
-        elif configured_path and os.path.isfile(configured_path): path_to_use = configured_path
-        elif path_from_env: path_to_use = path_from_env
-        else: path_to_use = ""
+        if self._is_file(str(local_ffmpeg)): path_to_use = str(local_ffmpeg.resolve())
+        elif self._is_file(configured_path): path_to_use = configured_path
+        else: path_to_use = FFmpegManager.find_executable() or ""
         
         self.ffmpeg_path_var.set(path_to_use)
         logger.info(f"Usando FFmpeg de: {path_to_use if path_to_use else 'Nenhum encontrado'}")
         self.update_ffmpeg_status()
 
     def update_ffmpeg_status(self):
-        is_ok = self.ffmpeg_path_var.get() and os.path.isfile(self.ffmpeg_path_var.get())
+        is_ok = self._is_file(self.ffmpeg_path_var.get())
         self.ffmpeg_status_label.config(text="FFmpeg OK" if is_ok else "Não encontrado", bootstyle="success" if is_ok else "danger")
         if is_ok: self._check_available_encoders()
 
     def ask_ffmpeg_path_manual(self):
+        import tkinter.filedialog
         filetypes = [("Executáveis", "*.exe"), ("Todos", "*.*")] if platform.system() == "Windows" else [("Todos", "*")]
         filepath = tkinter.filedialog.askopenfilename(title="Selecione o executável do FFmpeg", filetypes=filetypes, parent=self.root)
         if filepath and "ffmpeg" in os.path.basename(filepath).lower(): self.ffmpeg_path_var.set(filepath)
@@ -595,24 +810,59 @@ class VideoEditorApp:
         self.update_ffmpeg_status()
 
     def _check_available_encoders(self):
-        self.available_encoders_cache = FFmpegManager.check_encoders(self.ffmpeg_path_var.get())
+        # A sondagem executa o FFmpeg; roda na thread de tarefas e o resultado
+        # volta pela progress_queue para não travar a UI.
+        self._job_queue.put((self._probe_encoders_job, (self.ffmpeg_path_var.get(),)))
+
+    def _probe_encoders_job(self, ffmpeg_path: str):
+        self.progress_queue.put(("encoders", ffmpeg_path, FFmpegManager.check_encoders(ffmpeg_path)))
+
+    def _apply_available_encoders(self, ffmpeg_path: str, encoders: List[str]):
+        if ffmpeg_path != self.ffmpeg_path_var.get(): return  # resultado de um caminho anterior
+        self.available_encoders_cache = encoders
         options = ["Automático", "CPU (libx264)"]
-        if "h264_nvenc" in self.available_encoders_cache: options.append("GPU (NVENC H.264)")
-        if "hevc_nvenc" in self.available_encoders_cache: options.append("GPU (NVENC HEVC)")
+        options += [label for name, label in HARDWARE_ENCODERS.items() if name in self.available_encoders_cache]
         self.video_codec_combobox.config(values=options)
         if self.video_codec_var.get() not in options: self.video_codec_var.set("Automático")
 
+    def _stat(self, path: str) -> Optional[os.stat_result]:
+        if not path: return None
+        now = time.monotonic()
+        cached = self._stat_cache.get(path)
+        if cached and now - cached[0] < (STAT_CACHE_TTL if cached[1] is not None else STAT_MISSING_TTL): return cached[1]
+        try: st = os.stat(path)
+        except OSError: st = None
+        self._stat_cache[path] = (now, st)
+        return st
+
+    def _forget_stat(self, var, *_):
+        self._stat_cache.pop(var.get(), None)
+
+    def _forget_missing_stats(self):
+        self._stat_cache = {path: entry for path, entry in self._stat_cache.items() if entry[1] is not None}
+
+    def _is_file(self, path: str) -> bool:
+        st = self._stat(path)
+        return st is not None and stat.S_ISREG(st.st_mode)
+
+    def _is_dir(self, path: str) -> bool:
+        st = self._stat(path)
+        return st is not None and stat.S_ISDIR(st.st_mode)
+
     def validate_inputs(self) -> bool:
         logger.info("Validando entradas...")
-        if not self.ffmpeg_path_var.get() or not os.path.isfile(self.ffmpeg_path_var.get()):
+        # Arquivos e pastas criados por fora do app (ex.: no Explorer) precisam ser vistos
+        # na hora: só as ausências lembradas são descartadas, os acertos seguem no cache.
+        self._forget_missing_stats()
+        if not self._is_file(self.ffmpeg_path_var.get()):
             Messagebox.show_error("Caminho do FFmpeg inválido.", "Erro de Configuração", parent=self.root); self.notebook.select(4); return False
-        if not self.output_folder.get() or not os.path.isdir(self.output_folder.get()):
+        if not self._is_dir(self.output_folder.get()):
             Messagebox.show_error("Pasta de saída inválida.", "Erro de Saída", parent=self.root); return False
         
         mode = self.media_type.get()
-        if mode == "video_single" and not os.path.isfile(self.media_path_single.get()): Messagebox.show_error("Arquivo de vídeo principal inválido.", "Erro de Entrada", parent=self.root); return False
-        if mode == "image_folder" and not os.path.isdir(self.media_path_single.get()): Messagebox.show_error("Pasta de imagens inválida.", "Erro de Entrada", parent=self.root); return False
-        if mode == "batch" and (not os.path.isdir(self.batch_video_parent_folder.get()) or not os.path.isdir(self.batch_audio_folder.get())): Messagebox.show_error("Pastas de lote inválidas.", "Erro de Entrada", parent=self.root); return False
+        if mode == "video_single" and not self._is_file(self.media_path_single.get()): Messagebox.show_error("Arquivo de vídeo principal inválido.", "Erro de Entrada", parent=self.root); return False
+        if mode == "image_folder" and not self._is_dir(self.media_path_single.get()): Messagebox.show_error("Pasta de imagens inválida.", "Erro de Entrada", parent=self.root); return False
+        if mode == "batch" and (not self._is_dir(self.batch_video_parent_folder.get()) or not self._is_dir(self.batch_audio_folder.get())): Messagebox.show_error("Pastas de lote inválidas.", "Erro de Entrada", parent=self.root); return False
         
         logger.info("Entradas validadas com sucesso.")
         return True
@@ -632,13 +882,14 @@ class VideoEditorApp:
 
         self.update_status_textbox("Iniciando processamento...", append=False, tag="info")
         params = self._gather_processing_params()
-        future = self.thread_executor.submit(video_processing_logic.process_entrypoint, params, self.progress_queue, self.cancel_requested)
+        future = video_processing_logic.submit_export(params, self.progress_queue, self.cancel_requested)
         future.add_done_callback(self._processing_thread_done_callback)
 
     def _gather_processing_params(self) -> Dict[str, Any]:
-        params = {var_name.replace("_var", ""): var_obj.get() for var_name, var_obj in self.__dict__.items() if isinstance(var_obj, tk.Variable)}
+        # Um único .get() por variável; o estilo da legenda reaproveita os mesmos valores.
+        params = {key: var.get() for key, var in self._tk_vars}
         params['available_encoders'] = self.available_encoders_cache
-        params['subtitle_style'] = {'fontsize': self.subtitle_fontsize_var.get(), 'text_color': self.subtitle_textcolor_var.get(), 'outline_color': self.subtitle_outlinecolor_var.get(), 'bold': self.subtitle_bold_var.get(), 'italic': self.subtitle_italic_var.get(), 'position': self.subtitle_position_var.get(), 'font_file': self.subtitle_font_file.get(), 'position_map': SUBTITLE_POSITIONS}
+        params['subtitle_style'] = {'fontsize': params['subtitle_fontsize'], 'text_color': params['subtitle_textcolor'], 'outline_color': params['subtitle_outlinecolor'], 'bold': params['subtitle_bold'], 'italic': params['subtitle_italic'], 'position': params['subtitle_position'], 'font_file': params['subtitle_font_file'], 'position_map': SUBTITLE_POSITIONS}
         return params
 
     def request_cancellation(self):
@@ -664,27 +915,75 @@ class VideoEditorApp:
         self.progress_bar.config(bootstyle=final_style)
         self.batch_progress_bar.config(bootstyle=f"info-{final_style}")
 
+    def _notify_queue(self):
+        if self._drain_pending.is_set(): return
+        self._drain_pending.set()
+        try: self.root.event_generate("<<ProgressMsg>>", when="tail")
+        except (RuntimeError, tk.TclError): pass  # mainloop ainda/já parado; o check_queue cobre
+
     def check_queue(self):
+        # Rede de segurança para eventos perdidos; a drenagem normal vem de <<ProgressMsg>>.
+        self._drain_queue()
+        self._check_queue_job = self.root.after(QUEUE_SAFETY_TICK_MS, self.check_queue)
+
+    def _drain_queue(self):
+        # Nunca roda dentro de si mesma (ex.: evento ou tick processado por um laço de
+        # eventos aninhado); o que chegar nesse meio-tempo é lido pela drenagem em curso.
+        if self._draining: return
+        self._draining = True
+        self._drain_pending.clear()
+        # Sequências seguidas de status/progresso são aplicadas de uma só vez: as linhas
+        # entram no widget juntas e das barras só interessa o último valor recebido.
+        status_lines = []
+        progress = batch_progress = None
+
+        def flush():
+            nonlocal progress, batch_progress
+            if progress is not None: self.progress_bar['value'] = progress * 100
+            if batch_progress is not None: self.batch_progress_bar['value'] = batch_progress * 100
+            if status_lines: self._insert_status_lines(status_lines)
+            status_lines.clear()
+            progress = batch_progress = None
+
         try:
             while True:
                 msg_type, *payload = self.progress_queue.get_nowait()
-                if msg_type == "status": self.update_status_textbox(payload[0], tag=payload[1])
-                elif msg_type == "progress": self.progress_bar['value'] = payload[0] * 100
-                elif msg_type == "batch_progress": self.batch_progress_bar['value'] = payload[0] * 100
-                elif msg_type == "finish": self._finalize_processing_ui_state(success=payload[0])
+                if msg_type == "status": status_lines.append(self._format_status_line(payload[0], payload[1])); continue
+                elif msg_type == "progress": progress = payload[0]; continue
+                elif msg_type == "batch_progress": batch_progress = payload[0]; continue
+                # As demais mensagens mudam o estado da UI; o que chegou antes delas é aplicado primeiro.
+                flush()
+                if msg_type == "finish": self._finalize_processing_ui_state(success=payload[0])
                 elif msg_type == "ffmpeg_check": self.update_ffmpeg_status()
-                elif msg_type == "messagebox": Messagebox.show_info(payload[2], payload[1], parent=self.root) if payload[0] == 'info' else Messagebox.show_error(payload[2], payload[1], parent=self.root)
+                elif msg_type == "encoders": self._apply_available_encoders(*payload)
+                # Diálogos são modais e rodam um laço de eventos próprio: abrem só depois da drenagem.
+                elif msg_type == "messagebox": self.root.after_idle(self._show_messagebox, *payload)
         except queue.Empty: pass
-        finally: self.root.after(100, self.check_queue)
+        finally:
+            flush()
+            self._draining = False
+
+    def _show_messagebox(self, kind: str, title: str, message: str):
+        if kind == 'info': Messagebox.show_info(message, title, parent=self.root)
+        else: Messagebox.show_error(message, title, parent=self.root)
     
     def update_status_textbox(self, text: str, append: bool = True, tag: str = "info"):
+        self._insert_status_lines([self._format_status_line(text, tag)], clear=not append)
+
+    def _format_status_line(self, text: str, tag: str) -> Tuple[str, str]:
+        logger.log(logging.INFO if tag != "error" else logging.ERROR, text)
+        return f"[{datetime.datetime.now().strftime('%H:%M:%S')}] {text}\n", tag
+
+    def _insert_status_lines(self, lines: List[Tuple[str, str]], clear: bool = False):
+        # Só acompanha o fim do log se o usuário não tiver rolado para cima.
+        follow = clear or self.status_text.yview()[1] >= 0.999
         self.status_text.config(state=NORMAL)
-        full_log_line = f"[{datetime.datetime.now().strftime('%H:%M:%S')}] {text}\n"
-        if not append: self.status_text.delete("1.0", END)
-        self.status_text.insert(END, full_log_line, tag)
-        self.status_text.see(END)
+        if clear: self.status_text.delete("1.0", END)
+        # Text.insert aceita vários pares (texto, tag) em uma única chamada Tcl.
+        self.status_text.insert(END, *(part for line in lines for part in line))
+        self.status_text.delete("1.0", f"end - {STATUS_LOG_MAX_LINES} lines")
+        if follow: self.status_text.see(END)
         self.status_text.config(state=DISABLED)
-        logger.log(logging.INFO if tag != "error" else logging.ERROR, text)
 
     def save_current_config(self):
         config_to_save = {
@@ -704,8 +1003,13 @@ class VideoEditorApp:
             'image_duration': self.image_duration_var.get(),
             'slideshow_transition': self.transition_var.get(),
             'slideshow_motion': self.motion_var.get(),
+            'encoder_cache': FFmpegManager.dump_encoders_cache(self.ffmpeg_path_var.get()),
         }
+        if all(self.config.get(key) == value for key, value in config_to_save.items()):
+            logger.info("Configuração inalterada; nada a salvar.")
+            return
         ConfigManager.save_config(config_to_save)
+        self.config.update(config_to_save)
         logger.info("Configuração salva.")
 
     def on_closing(self):
@@ -715,9 +1019,12 @@ class VideoEditorApp:
                 self.request_cancellation()
         else:
             self.save_current_config()
-            self.thread_executor.shutdown(wait=False, cancel_futures=True)
             if video_processing_logic and hasattr(video_processing_logic, 'process_manager'):
                 video_processing_logic.process_manager.shutdown()
+            # Encerra o tick de segurança e registra as últimas mensagens pendentes
+            # antes de destruir a janela.
+            if hasattr(self, '_check_queue_job'): self.root.after_cancel(self._check_queue_job)
+            self._drain_queue()
             logger.info("Aplicativo fechado.")
             self.root.destroy()
 
@@ -1,4 +1,5 @@
 import subprocess
+import sys
 import tempfile
 import platform
 import os
@@ -6,19 +7,49 @@ import re
 import math
 import glob
 import shutil
+import stat
 import json
 import logging
 import time
 import atexit
 import threading
 import random
+import functools
 from pathlib import Path
-from typing import List, Tuple, Dict, Any, Optional, Callable, IO
-from queue import Queue, Empty
-from math import ceil
+from typing import List, Tuple, Dict, Any, Optional, Callable, IO, Deque
+from queue import Queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from itertools import cycle, islice
+
+try:
+    import orjson
+except ImportError:
+    # orjson é opcional; sem ele usamos o parser padrão (ambos aceitam str e bytes).
+    orjson = None
 
 # --- Configuração ---
 logger = logging.getLogger(__name__)
+# Buffer de 1 MB nos pipes do FFmpeg/ffprobe para reduzir o número de read().
+_PIPE_BUFSIZE = 1 << 20
+# No Linux o pipe do kernel também é ampliado (F_SETPIPE_SZ, Python 3.10+), para que o
+# FFmpeg não bloqueie escrevendo enquanto as threads leitoras estão atrasadas.
+_PIPE_SIZE_KWARGS = {"pipesize": _PIPE_BUFSIZE} if sys.version_info >= (3, 10) else {}
+# Tamanho máximo de cada leitura da saída do FFmpeg.
+_READ_CHUNK = 64 * 1024
+# Blocos finais do stderr guardados para o log de erro (o começo não interessa).
+_STDERR_TAIL_CHUNKS = 256
+# Tempo que o FFmpeg tem para sair depois de fechar o stdout antes de ser morto.
+_EXIT_TIMEOUT = 5
+_json_loads = orjson.loads if orjson is not None else json.loads
+# O sistema não muda durante a execução; consultado uma vez na importação.
+_IS_WINDOWS = platform.system() == "Windows"
+_CREATION_FLAGS = subprocess.CREATE_NO_WINDOW if _IS_WINDOWS else 0
+_FFPROBE_EXE = "ffprobe.exe" if _IS_WINDOWS else "ffprobe"
+# Padrões compilados uma vez; o do idioma roda para cada arquivo do lote.
+_RESOLUTION_RE = re.compile(r'(\d+)\s*[xX]\s*(\d+)')
+_LANG_CODE_RE = re.compile(r'_(?P<lang>[a-z]{2}(_[A-Z]{2})?)\.')
+_PROGRESS_RE = re.compile(rb'^out_time_ms=(\d+)', re.MULTILINE)
 
 # --- Classes Auxiliares ---
 
@@ -64,14 +95,21 @@ class FFmpegProcessManager:
 
 process_manager = FFmpegProcessManager()
 
+# Pool compartilhado pelas exportações: as threads são reaproveitadas entre execuções.
+_EXPORT_POOL = ThreadPoolExecutor(max_workers=max(2, (os.cpu_count() or 2) // 2), thread_name_prefix="export")
+
 # --- Lógica Principal ---
 
-def _stream_reader(stream: Optional[IO], line_queue: Queue):
-    """Lê linhas de um stream e as coloca em uma fila."""
+def _stream_reader(stream: Optional[IO], chunks: Deque[bytes], log_prefix: str):
+    """Guarda os últimos blocos de um stream (o stderr do FFmpeg) até o EOF."""
     if not stream: return
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
     try:
-        for line in iter(lambda: stream.read(1024), b''):
-            line_queue.put(line.decode('utf-8', errors='ignore'))
+        # read1 devolve o que já estiver disponível (até _READ_CHUNK) com no máximo um read().
+        for chunk in iter(lambda: stream.read1(_READ_CHUNK), b''):
+            chunks.append(chunk)
+            if debug_enabled:
+                logger.debug(f"[{log_prefix}/ffmpeg] {chunk.decode('utf-8', errors='ignore').rstrip()}")
     except Exception as e:
         logger.warning(f"O leitor de stream encontrou um erro: {e}")
     finally:
@@ -80,67 +118,99 @@ def _stream_reader(stream: Optional[IO], line_queue: Queue):
         except Exception:
             pass
 
+def _cancel_watcher(process: subprocess.Popen, cancel_event: threading.Event, finished: threading.Event, uses_script: bool, log_prefix: str, progress_queue: Queue):
+    """Encerra o FFmpeg assim que o cancelamento é pedido, desbloqueando a leitura do stdout."""
+    # Espera no próprio evento de cancelamento: reage na hora; o timeout só serve para
+    # perceber que o processo já terminou e encerrar a thread.
+    while not cancel_event.wait(0.5):
+        if finished.is_set(): return
+    if finished.is_set(): return
+    logger.warning(f"[{log_prefix}] Evento de cancelamento ativado. Encerrando processo FFmpeg {process.pid}.")
+    progress_queue.put(("status", f"[{log_prefix}] Recebido sinal de cancelamento. Encerrando...", "warning"))
+    if uses_script:
+        # O FFmpeg é filho do cmd.exe; terminar só o cmd deixaria o FFmpeg (e os pipes) vivos.
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True, creationflags=_CREATION_FLAGS)
+    else:
+        process.terminate()
+
 def _execute_ffmpeg(cmd: List[str], duration: float, progress_callback: Callable[[float], None], cancel_event: threading.Event, log_prefix: str, progress_queue: Queue) -> bool:
     logger.info(f"[{log_prefix}] Executando FFmpeg: {' '.join(cmd)}")
     progress_queue.put(("status", f"[{log_prefix}] Iniciando processo FFmpeg...", "info"))
     
-    cmd_with_progress = cmd[:1] + ["-progress", "pipe:1", "-nostats"] + cmd[1:]
-    creation_flags = subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
-
-    cmd_str = subprocess.list2cmdline(cmd_with_progress)
-
-    if platform.system() == "Windows" and len(cmd_str) > 8000:
-        # Em ambientes Windows, o comprimento máximo da linha de comando é
-        # limitado. Para contornar o problema de forma confiável, gravamos todo
-        # o comando em um arquivo .bat e executamos esse script.
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".bat", mode="w", encoding="utf-8") as f:
-            f.write(cmd_str)
-            script_path = f.name
-        logger.debug(f"[{log_prefix}] Comando muito longo, usando script temporário {script_path}")
-        cmd_exec = ["cmd", "/C", script_path]
-    else:
-        cmd_exec = cmd_with_progress
-
-    process = subprocess.Popen(cmd_exec, stdout=subprocess.PIPE, stderr=subprocess.PIPE, creationflags=creation_flags)
+    cmd_with_progress = cmd[:1] + ["-progress", "pipe:1", "-nostats"] + cmd[1:]
+
+    cmd_str = subprocess.list2cmdline(cmd_with_progress)
+
+    uses_script = _IS_WINDOWS and len(cmd_str) > 8000
+    if uses_script:
+        # Em ambientes Windows, o comprimento máximo da linha de comando é
+        # limitado. Para contornar o problema de forma confiável, gravamos todo
+        # o comando em um arquivo .bat e executamos esse script.
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".bat", mode="w", encoding="utf-8") as f:
+            f.write(cmd_str)
+            script_path = f.name
+        logger.debug(f"[{log_prefix}] Comando muito longo, usando script temporário {script_path}")
+        cmd_exec = ["cmd", "/C", script_path]
+    else:
+        cmd_exec = cmd_with_progress
+
+    process = subprocess.Popen(cmd_exec, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=_PIPE_BUFSIZE, creationflags=_CREATION_FLAGS, **_PIPE_SIZE_KWARGS)
     process_manager.add(process)
     
-    output_queue = Queue()
-    stdout_thread = threading.Thread(target=_stream_reader, args=(process.stdout, output_queue), daemon=True)
-    stderr_thread = threading.Thread(target=_stream_reader, args=(process.stderr, output_queue), daemon=True)
-    stdout_thread.start(); stderr_thread.start()
-
-    full_output = ""
+    # O stdout (progresso) é lido aqui mesmo, em leituras bloqueantes: sem fila entre
+    # threads e sem acordar enquanto o FFmpeg não escreve. O stderr só interessa em caso
+    # de erro, então uma thread guarda apenas o seu final.
+    stderr_tail: Deque[bytes] = deque(maxlen=_STDERR_TAIL_CHUNKS)
+    finished = threading.Event()
+    stderr_thread = threading.Thread(target=_stream_reader, args=(process.stderr, stderr_tail, log_prefix), daemon=True)
+    watcher_thread = threading.Thread(target=_cancel_watcher, args=(process, cancel_event, finished, uses_script, log_prefix, progress_queue), daemon=True)
+    stderr_thread.start(); watcher_thread.start()
+
+    # O último bloco pode terminar no meio de uma linha; o resto espera o próximo bloco.
+    partial_line = b""
     last_reported_pct = 0.0
+    # Avanços menores que 0,1% não mudam a barra; não vale acordar a interface por eles.
+    last_permille = -1
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
-    while process.poll() is None:
-        if cancel_event.is_set():
-            logger.warning(f"[{log_prefix}] Evento de cancelamento ativado. Encerrando processo FFmpeg {process.pid}.")
-            progress_queue.put(("status", f"[{log_prefix}] Recebido sinal de cancelamento. Encerrando...", "warning"))
-            process.terminate(); break
-
+    try:
+        for chunk in iter(lambda: process.stdout.read1(_READ_CHUNK), b''):
+            data = partial_line + chunk
+            end = data.rfind(b'\n') + 1
+            partial_line = data[end:]
+            if not end: continue
+            lines = data[:end]
+            # Só o último out_time_ms do bloco importa; os anteriores já estão superados.
+            match = None
+            for match in _PROGRESS_RE.finditer(lines): pass
+            if match and duration > 0:
+                progress_pct = min(int(match.group(1)) / 1_000_000 / duration, 1.0)
+                permille = int(progress_pct * 1000)
+                if permille != last_permille:
+                    progress_callback(progress_pct)
+                    last_permille = permille
+                if progress_pct - last_reported_pct >= 0.05:
+                   progress_queue.put(("status", f"[{log_prefix}] {int(progress_pct*100)}% concluído...", "info"))
+                   last_reported_pct = progress_pct
+            if debug_enabled:
+                logger.debug(f"[{log_prefix}/ffmpeg] {lines.decode('utf-8', errors='ignore').rstrip()}")
+    except Exception as e:
+        logger.warning(f"[{log_prefix}] Erro ao ler a saída do FFmpeg: {e}")
+    finally:
+        process.stdout.close()
         try:
-            for line in output_queue.get(timeout=0.1).split('\n'):
-                full_output += line + '\n'
-                if "out_time_ms=" in line:
-                    time_ms_str = line.split("=")[1].strip()
-                    if time_ms_str.isdigit():
-                        current_time_sec = int(time_ms_str) / 1_000_000
-                        if duration > 0:
-                            progress_pct = min(current_time_sec / duration, 1.0)
-                            progress_callback(progress_pct)
-                            if progress_pct - last_reported_pct >= 0.05:
-                               progress_queue.put(("status", f"[{log_prefix}] {int(progress_pct*100)}% concluído...", "info"))
-                               last_reported_pct = progress_pct
-                else:
-                    logger.debug(f"[{log_prefix}/ffmpeg] {line.strip()}")
-        except Empty:
-            continue
-
-    process.wait(timeout=5)
-    process_manager.remove(process)
+            process.wait(timeout=_EXIT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            logger.error(f"[{log_prefix}] FFmpeg {process.pid} não encerrou após fechar a saída, matando.")
+            process.kill()
+            process.wait()
+        finally:
+            # Sempre libera o vigia de cancelamento e o registro do processo.
+            finished.set()
+            process_manager.remove(process)
     
-    while not output_queue.empty():
-        full_output += output_queue.get_nowait()
+    stderr_thread.join(timeout=1)
+    full_output = b"".join(stderr_tail).decode('utf-8', errors='ignore')
 
     if cancel_event.is_set():
         logger.warning(f"[{log_prefix}] Processo cancelado.")
@@ -158,79 +228,130 @@ def _execute_ffmpeg(cmd: List[str], duration: float, progress_callback: Callable
         return False
 
 
+@functools.lru_cache(maxsize=512)
+def _run_ffprobe(ffprobe_path: str, path: str, mtime_ns: int, size: int) -> bytes:
+    # mtime e tamanho só entram na chave do cache: um arquivo alterado é sondado de novo.
+    # Falhas levantam exceção e por isso não ficam em cache.
+    cmd = [ffprobe_path, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path]
+    # Saída em bytes: o parser JSON decodifica direto, sem passar por str.
+    result = subprocess.run(cmd, capture_output=True, check=True, timeout=15, bufsize=_PIPE_BUFSIZE, creationflags=_CREATION_FLAGS)
+    return result.stdout
+
+# ffprobe encontrado ao lado de cada FFmpeg. Só acertos ficam guardados, para que um
+# ffprobe instalado depois (ex.: pelo download automático) ainda seja encontrado.
+_FFPROBE_PATHS: Dict[str, str] = {}
+
+def _resolve_ffprobe(ffmpeg_path: str) -> Optional[str]:
+    ffprobe_path = _FFPROBE_PATHS.get(ffmpeg_path)
+    if ffprobe_path is None:
+        candidate = os.path.join(os.path.dirname(ffmpeg_path), _FFPROBE_EXE)
+        if not os.path.exists(candidate):
+            logger.warning(f"ffprobe não encontrado em {candidate}")
+            return None
+        ffprobe_path = _FFPROBE_PATHS[ffmpeg_path] = candidate
+    return ffprobe_path
+
 def _probe_media_properties(path: str, ffmpeg_path: str) -> Optional[Dict]:
-    if not path or not os.path.isfile(path): return None
+    try: st = os.stat(path) if path else None
+    except OSError: st = None
+    if st is None or not stat.S_ISREG(st.st_mode): return None
     
-    ffprobe_exe = "ffprobe.exe" if platform.system() == "Windows" else "ffprobe"
-    ffprobe_path = os.path.join(Path(ffmpeg_path).parent, ffprobe_exe)
-    if not os.path.exists(ffprobe_path):
-        logger.warning(f"ffprobe não encontrado em {ffprobe_path}")
-        return None
+    ffprobe_path = _resolve_ffprobe(ffmpeg_path)
+    if ffprobe_path is None: return None
         
     try:
-        cmd = [ffprobe_path, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path]
-        creation_flags = subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=15, creationflags=creation_flags, encoding='utf-8', errors='ignore')
-        return json.loads(result.stdout)
+        # No lote os mesmos vídeos são sorteados várias vezes; o ffprobe roda uma vez
+        # por arquivo e cada chamada recebe um dict novo, decodificado da saída em cache.
+        return _json_loads(_run_ffprobe(ffprobe_path, path, st.st_mtime_ns, st.st_size))
     except Exception as e:
         logger.warning(f"Não foi possível obter propriedades de '{Path(path).name}': {e}")
         return None
 
+def _audio_codec(props: Optional[Dict]) -> Optional[str]:
+    """Codec da primeira trilha de áudio nas propriedades do ffprobe, se houver."""
+    audio_stream = next((s for s in (props or {}).get('streams', []) if s.get('codec_type') == 'audio'), None)
+    return audio_stream.get('codec_name') if audio_stream else None
+
+@functools.lru_cache(maxsize=32)
 def _parse_resolution(res_str: str) -> Tuple[int, int]:
-    match = re.search(r'(\d+)\s*[xX]\s*(\d+)', res_str)
+    match = _RESOLUTION_RE.search(res_str)
     return (int(match.group(1)), int(match.group(2))) if match else (1920, 1080)
 
 def _get_codec_params(params: Dict, force_reencode=False) -> List[str]:
-    video_codec = params.get('video_codec', 'Automático')
-    available_encoders = params.get('available_encoders', [])
-    
     if not force_reencode:
         logger.info("Resolução do vídeo e legendas permitem cópia direta. Usando '-c:v copy'.")
         return ["-c:v", "copy"]
 
+    video_codec = params.get('video_codec', 'Automático')
+    available_encoders = tuple(params.get('available_encoders') or ())
+    codec_params = _select_codec_params(video_codec, available_encoders)
+    logger.info(f"Re-codificação de vídeo necessária. Usando encoder: {codec_params[1]}")
+    # Devolve uma lista nova para que o chamador não altere a tupla em cache.
+    codec_args = list(codec_params)
+    if codec_params[1] == "libx264" and params.get('encoder_threads'):
+        codec_args += ["-threads", str(params['encoder_threads'])]
+    return codec_args
+
+@functools.lru_cache(maxsize=64)
+def _select_codec_params(video_codec: str, available_encoders: Tuple[str, ...]) -> Tuple[str, ...]:
     encoder = "libx264"
     codec_flags = ["-preset", "veryfast", "-crf", "23"]
     
-    auto_select_gpu = video_codec == 'Automático' and any(e in available_encoders for e in ["h264_nvenc", "hevc_nvenc"])
+    pix_fmt = "yuv420p"
+    auto_select = video_codec == 'Automático'
+    auto_select_gpu = auto_select and any(e in available_encoders for e in ["h264_nvenc", "hevc_nvenc"])
 
     if auto_select_gpu or "NVENC" in video_codec:
         if "hevc_nvenc" in available_encoders and ("HEVC" in video_codec or auto_select_gpu):
             encoder, codec_flags = "hevc_nvenc", ["-preset", "p4", "-cq", "23"]
         elif "h264_nvenc" in available_encoders:
             encoder, codec_flags = "h264_nvenc", ["-preset", "p4", "-cq", "23"]
+    # Sem NVENC, o modo automático tenta os demais encoders de hardware que a GUI
+    # confirmou funcionar, antes de cair no libx264.
+    elif "h264_qsv" in available_encoders and (auto_select or "QSV" in video_codec):
+        encoder, codec_flags, pix_fmt = "h264_qsv", ["-preset", "veryfast", "-global_quality", "23"], "nv12"
+    elif "h264_amf" in available_encoders and (auto_select or "AMF" in video_codec):
+        encoder, codec_flags = "h264_amf", ["-quality", "speed", "-rc", "cqp", "-qp_i", "23", "-qp_p", "23"]
+    elif "h264_videotoolbox" in available_encoders and (auto_select or "VideoToolbox" in video_codec):
+        encoder, codec_flags = "h264_videotoolbox", ["-b:v", "6M"]
             
-    logger.info(f"Re-codificação de vídeo necessária. Usando encoder: {encoder}")
-    return ["-c:v", encoder, *codec_flags, "-pix_fmt", "yuv420p"]
+    return ("-c:v", encoder, *codec_flags, "-pix_fmt", pix_fmt)
+
+# Template ASS montado uma única vez; apenas os valores variam por exportação.
+_SUBTITLE_STYLE_TEMPLATE = (
+    "FontName={font},FontSize={size},PrimaryColour={primary},OutlineColour={outline},"
+    "BorderStyle=1,Outline=2,Shadow=1,Bold={bold},Italic={italic},Alignment={alignment},MarginV={margin}"
+)
+
+def _to_ass_color(hex_color: str) -> str:
+    """Converte ``#RRGGBB`` para o formato ASS ``&HBBGGRR``."""
+    hex_color = hex_color.lstrip('#')
+    return ("&H" + hex_color[4:6] + hex_color[2:4] + hex_color[0:2]).upper() if len(hex_color) == 6 else "&H00FFFFFF"
 
 def _build_subtitle_style_string(style_params: Dict) -> str:
     """
     Constrói uma string de estilo ASS a partir de um dicionário de parâmetros.
-    Esta função foi corrigida para extrair apenas os valores relevantes e formatá-los
-    corretamente, evitando a inclusão de estruturas de dados (como dicionários)
-    na string final, o que causava o erro de parsing do FFmpeg.
+    Apenas os valores relevantes são extraídos e aplicados ao template, evitando
+    a inclusão de estruturas de dados (como dicionários) na string final, o que
+    causava o erro de parsing do FFmpeg.
     """
-    def to_ass_color(hex_color: str) -> str:
-        hex_color = hex_color.lstrip('#')
-        return f"&H{hex_color[4:6]}{hex_color[2:4]}{hex_color[0:2]}".upper() if len(hex_color) == 6 else "&H00FFFFFF"
-
-    font_name = Path(style_params.get('font_file')).stem if style_params.get('font_file') else 'Arial'
-    
-    # Constrói um dicionário limpo apenas com as chaves e valores esperados pelo estilo ASS.
-    style_parts = {
-        'FontName': font_name,
-        'FontSize': style_params.get('fontsize', 28),
-        'PrimaryColour': to_ass_color(style_params.get('text_color', '#FFFFFF')),
-        'OutlineColour': to_ass_color(style_params.get('outline_color', '#000000')),
-        'BorderStyle': 1,
-        'Outline': 2,
-        'Shadow': 1,
-        'Bold': -1 if style_params.get('bold', True) else 0,
-        'Italic': -1 if style_params.get('italic', False) else 0,
-        'Alignment': style_params.get('position_map', {}).get(style_params.get('position'), 2),
-        'MarginV': int(style_params.get('fontsize', 28) * 0.7)
-    }
-    # Retorna a string formatada corretamente.
-    return ",".join(f"{k}={v}" for k, v in style_parts.items())
+    font_file = style_params.get('font_file')
+    fontsize = style_params.get('fontsize', 28)
+    return _SUBTITLE_STYLE_TEMPLATE.format(
+        font=Path(font_file).stem if font_file else 'Arial',
+        size=fontsize,
+        primary=_to_ass_color(style_params.get('text_color', '#FFFFFF')),
+        outline=_to_ass_color(style_params.get('outline_color', '#000000')),
+        bold=-1 if style_params.get('bold', True) else 0,
+        italic=-1 if style_params.get('italic', False) else 0,
+        alignment=style_params.get('position_map', {}).get(style_params.get('position'), 2),
+        margin=int(fontsize * 0.7),
+    )
+
+@functools.lru_cache(maxsize=64)
+def _escape_subtitle_path(subtitle_path: str) -> str:
+    """Caminho no formato aceito pelo filtro ``subtitles`` (barras normais e ``:`` escapado)."""
+    return Path(subtitle_path).as_posix().replace(':', r'\:')
 
 def process_entrypoint(params: Dict[str, Any], progress_queue: Queue, cancel_event: threading.Event):
     temp_dir = tempfile.mkdtemp(prefix="kyle-editor-")
@@ -265,6 +386,10 @@ def process_entrypoint(params: Dict[str, Any], progress_queue: Queue, cancel_eve
         progress_queue.put(("status", final_message, final_tag))
         logger.info(f"Processamento finalizado. Sucesso: {success}, Cancelado: {cancelled}")
 
+def submit_export(params: Dict[str, Any], progress_queue: Queue, cancel_event: threading.Event) -> Future:
+    """Agenda ``process_entrypoint`` no pool compartilhado de exportação."""
+    return _EXPORT_POOL.submit(process_entrypoint, params, progress_queue, cancel_event)
+
 def _run_single_item_processing(params: Dict[str, Any], progress_queue: Queue, cancel_event: threading.Event, progress_callback: Optional[Callable[[float], None]] = None) -> bool:
     if cancel_event.is_set(): return False
     
@@ -273,23 +398,31 @@ def _run_single_item_processing(params: Dict[str, Any], progress_queue: Queue, c
     music_path = params.get('music_file_single')
     subtitle_path = params.get('subtitle_file_single')
     output_path = os.path.join(params['output_folder'], params['output_filename_single'])
+    target_w, target_h = _parse_resolution(params['resolution'])
+    # O slideshow entrega o vídeo já como grafo de filtros (entradas + rótulo de saída),
+    # que entra direto neste comando em vez de passar por um arquivo intermediário.
+    video_source = params.get('video_source')
 
-    video_props = _probe_media_properties(video_path, params['ffmpeg_path'])
-    if not video_props:
-        progress_queue.put(("status", "Erro: Não foi possível ler as propriedades do vídeo de entrada.", "error")); return False
-    
-    video_stream = next((s for s in video_props.get('streams', []) if s['codec_type'] == 'video'), None)
-    if not video_stream:
-        progress_queue.put(("status", "Erro: Nenhuma trilha de vídeo encontrada no arquivo de entrada.", "error")); return False
+    if video_source:
+        video_props = {'format': {'duration': video_source['duration']}}
+        source_w, source_h = target_w, target_h
+    else:
+        video_props = _probe_media_properties(video_path, params['ffmpeg_path'])
+        if not video_props:
+            progress_queue.put(("status", "Erro: Não foi possível ler as propriedades do vídeo de entrada.", "error")); return False
         
-    source_w, source_h = video_stream.get('width'), video_stream.get('height')
-    target_w, target_h = _parse_resolution(params['resolution'])
+        video_stream = next((s for s in video_props.get('streams', []) if s['codec_type'] == 'video'), None)
+        if not video_stream:
+            progress_queue.put(("status", "Erro: Nenhuma trilha de vídeo encontrada no arquivo de entrada.", "error")); return False
+            
+        source_w, source_h = video_stream.get('width'), video_stream.get('height')
     
     narration_duration = 0
+    narration_props = None
     if narration_path and os.path.isfile(narration_path):
-        props = _probe_media_properties(narration_path, params['ffmpeg_path'])
-        if props and 'format' in props and 'duration' in props['format']:
-            narration_duration = float(props['format']['duration'])
+        narration_props = _probe_media_properties(narration_path, params['ffmpeg_path'])
+        if narration_props and 'format' in narration_props and 'duration' in narration_props['format']:
+            narration_duration = float(narration_props['format']['duration'])
             progress_queue.put(("status", f"Duração da narração detectada: {narration_duration:.2f}s", "info"))
         else:
             progress_queue.put(("status", f"Aviso: Não foi possível ler a duração da narração '{Path(narration_path).name}'", "warning"))
@@ -300,17 +433,24 @@ def _run_single_item_processing(params: Dict[str, Any], progress_queue: Queue, c
 
     inputs, filter_complex_parts, map_args = [], [], []
     
-    inputs.extend(["-i", video_path])
-    video_input_idx = 0
+    if video_source:
+        inputs.extend(video_source['inputs'])
+        filter_complex_parts.extend(video_source['filters'])
+        video_label, video_is_filtered = video_source['label'], True
+        input_count = video_source['input_count']
+    else:
+        inputs.extend(["-i", video_path])
+        video_label, video_is_filtered = "0:v", False
+        input_count = 1
     
-    audio_input_count = 0
     narration_input_idx = -1
     if narration_path and os.path.isfile(narration_path):
         inputs.extend(["-i", narration_path])
-        audio_input_count += 1
-        narration_input_idx = audio_input_count
+        narration_input_idx = input_count
+        input_count += 1
     
     music_input_idx = -1
+    music_props = None
     if music_path and os.path.isfile(music_path):
         music_props = _probe_media_properties(music_path, params['ffmpeg_path'])
         music_duration = float(music_props.get('format', {}).get('duration', 0)) if music_props else 0
@@ -320,45 +460,57 @@ def _run_single_item_processing(params: Dict[str, Any], progress_queue: Queue, c
             inputs.extend(["-stream_loop", "-1"])
         
         inputs.extend(["-i", music_path])
-        audio_input_count += 1
-        music_input_idx = audio_input_count
+        music_input_idx = input_count
+        input_count += 1
 
-    audio_to_mix = []
+    audio_sources = []
     if narration_input_idx != -1:
-        filter_complex_parts.append(f"[{narration_input_idx}:a]volume={params['narration_volume']}dB[narrated]")
-        audio_to_mix.append("[narrated]")
+        audio_sources.append((narration_input_idx, params['narration_volume'], narration_props, "narrated"))
     if music_input_idx != -1:
-        filter_complex_parts.append(f"[{music_input_idx}:a]volume={params['music_volume']}dB[music]")
-        audio_to_mix.append("[music]")
-
-    if len(audio_to_mix) > 1:
-        filter_complex_parts.append(f"{''.join(audio_to_mix)}amix=inputs={len(audio_to_mix)}:duration=first:dropout_transition=3[aout]")
+        audio_sources.append((music_input_idx, params['music_volume'], music_props, "music"))
+
+    # Com uma só trilha não há mistura: ela é mapeada direto e o volume, se houver,
+    # vai em -af. Já em AAC e sem ajuste de volume, é copiada sem re-codificar.
+    audio_filter = None
+    copy_audio = False
+    if len(audio_sources) == 1:
+        input_idx, volume, props, _ = audio_sources[0]
+        map_args.extend(["-map", f"{input_idx}:a:0"])
+        if float(volume) != 0:
+            audio_filter = f"volume={volume}dB"
+        else:
+            copy_audio = _audio_codec(props) == 'aac'
+    elif audio_sources:
+        for input_idx, volume, _, label in audio_sources:
+            filter_complex_parts.append(f"[{input_idx}:a]volume={volume}dB[{label}]")
+        labels = ''.join(f"[{label}]" for *_, label in audio_sources)
+        filter_complex_parts.append(f"{labels}amix=inputs={len(audio_sources)}:duration=first:dropout_transition=3[aout]")
         map_args.extend(["-map", "[aout]"])
-    elif len(audio_to_mix) == 1:
-        map_args.extend(["-map", f"[{audio_input_count}:a]"])
     
     video_filters = []
-    force_reencode = not (source_w == target_w and source_h == target_h)
-    if force_reencode:
+    needs_scale = not (source_w == target_w and source_h == target_h)
+    force_reencode = video_is_filtered or needs_scale
+    if needs_scale:
         video_filters.append(f"scale={target_w}:{target_h}:force_original_aspect_ratio=decrease,pad={target_w}:{target_h}:(ow-iw)/2:(oh-ih)/2:color=black,setsar=1")
 
     if subtitle_path and os.path.isfile(subtitle_path):
-        style_str = _build_subtitle_style_string(params['subtitle_style'])
-        escaped_sub_path = str(Path(subtitle_path)).replace('\\', '/').replace(':', '\\:')
-        video_filters.append(f"subtitles='{escaped_sub_path}':force_style='{style_str}'")
+        style_str = params.get('_subtitle_style_cached') or _build_subtitle_style_string(params['subtitle_style'])
+        video_filters.append(f"subtitles='{_escape_subtitle_path(subtitle_path)}':force_style='{style_str}'")
         force_reencode = True
     
     if video_filters:
-        filter_complex_parts.insert(0, f"[{video_input_idx}:v]{','.join(video_filters)}[vout]")
+        filter_complex_parts.append(f"[{video_label}]{','.join(video_filters)}[vout]")
         map_args.extend(["-map", "[vout]"])
     else:
-        map_args.extend(["-map", f"{video_input_idx}:v"])
+        map_args.extend(["-map", f"[{video_label}]" if video_is_filtered else video_label])
 
     cmd = [params['ffmpeg_path'], "-y", *inputs]
     if filter_complex_parts: cmd.extend(["-filter_complex", ";".join(filter_complex_parts)])
     cmd.extend(map_args)
     cmd.extend(_get_codec_params(params, force_reencode=force_reencode))
-    if audio_to_mix: cmd.extend(["-c:a", "aac", "-b:a", "192k"])
+    if copy_audio: cmd.extend(["-c:a", "copy"])
+    elif audio_sources: cmd.extend(["-c:a", "aac", "-b:a", "192k"])
+    if audio_filter: cmd.extend(["-af", audio_filter])
     cmd.extend(["-t", str(final_duration), "-shortest", output_path])
     
     callback = progress_callback if progress_callback is not None else (lambda p: progress_queue.put(("progress", p)))
@@ -380,15 +532,17 @@ def _run_slideshow_processing(params: Dict[str, Any], progress_queue: Queue, can
 
     img_folder = params.get('media_path_single')
     supported_ext = ('.png', '.jpg', '.jpeg', '.bmp', '.webp');
-    images = sorted([os.path.join(img_folder, f) for f in os.listdir(img_folder) if f.lower().endswith(supported_ext)])
+    with os.scandir(img_folder) as entries:
+        images = sorted(entry.path for entry in entries if entry.is_file() and entry.name.lower().endswith(supported_ext))
     if not images:
         progress_queue.put(("status", f"Erro: Nenhuma imagem encontrada em {img_folder}.", "error")); return False
 
-    progress_queue.put(("status", "[Slideshow] Etapa 1: Gerando vídeo a partir das imagens...", "info"))
+    progress_queue.put(("status", "[Slideshow] Montando slideshow, áudio(s) e legendas em uma única passada...", "info"))
     
     img_duration = params.get('image_duration', 5)
-    num_images_needed = ceil(narration_duration / img_duration) if img_duration > 0 else len(images)
-    images_to_use = (images * (num_images_needed // len(images) + 1))[:num_images_needed]
+    num_images_needed = math.ceil(narration_duration / img_duration) if img_duration > 0 else len(images)
+    # Percorre as imagens em ciclo até cobrir a narração, sem montar a lista repetida inteira antes de cortar.
+    images_to_use = list(islice(cycle(images), num_images_needed))
     if not images_to_use:
         progress_queue.put(("status", "Erro: Nenhuma imagem para usar no slideshow.", "error")); return False
 
@@ -408,7 +562,6 @@ def _run_slideshow_processing(params: Dict[str, Any], progress_queue: Queue, can
         else:
             return f"scale={width}:{height},setsar=1,fps={fps}"
 
-    base_video_path = os.path.join(temp_dir, "slideshow_video.mp4")
     w, h = _parse_resolution(params['resolution'])
     transition = params.get('slideshow_transition', 'fade')
     motion = params.get('slideshow_motion', 'Nenhum')
@@ -428,31 +581,14 @@ def _run_slideshow_processing(params: Dict[str, Any], progress_queue: Queue, can
         last = f"x{idx}"
         offset += img_duration
 
-    filter_complex = ";".join(filter_parts)
-
-    cmd_video = [
-        params['ffmpeg_path'], "-y",
-        *inputs,
-        "-filter_complex", filter_complex,
-        "-map", f"[{last}]",
-        "-t", str(narration_duration),
-        "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
-        base_video_path
-    ]
-    
-    progress_queue.put(("status", "[SlideshowGen] Iniciando processo FFmpeg...", "info"))
-    if not _execute_ffmpeg(cmd_video, narration_duration, lambda p: progress_queue.put(("progress", p * 0.8)), cancel_event, "SlideshowGen", progress_queue):
-        return False
-    if cancel_event.is_set(): return False
-    
-    progress_queue.put(("status", "[Slideshow] Etapa 2: Combinando áudio(s) e legendas...", "info"))
-    
-    slideshow_params = {**params, 'media_path_single': base_video_path, 'narration_file_single': narration_path}
-    
-    def final_progress_callback(p: float):
-        progress_queue.put(("progress", 0.8 + p * 0.2))
-
-    return _run_single_item_processing(slideshow_params, progress_queue, cancel_event, progress_callback=final_progress_callback)
+    # O grafo do slideshow vira a fonte de vídeo do comando final: uma única
+    # codificação, sem o vídeo intermediário re-codificado na segunda etapa.
+    video_source = {
+        'inputs': inputs, 'filters': filter_parts, 'label': last,
+        'input_count': len(images_to_use), 'duration': narration_duration,
+    }
+    slideshow_params = {**params, 'video_source': video_source, 'narration_file_single': narration_path}
+    return _run_single_item_processing(slideshow_params, progress_queue, cancel_event)
 
 
 def _run_batch_processing(params: Dict[str, Any], progress_queue: Queue, cancel_event: threading.Event, temp_dir: str) -> bool:
@@ -466,26 +602,36 @@ def _run_batch_processing(params: Dict[str, Any], progress_queue: Queue, cancel_
     if not video_parent_folder or not os.path.isdir(video_parent_folder):
         progress_queue.put(("status", "Erro: Pasta de vídeos do lote inválida.", "error")); return False
 
-    audio_files = sorted([f for f in os.listdir(audio_folder) if os.path.isfile(os.path.join(audio_folder, f))])
+    # scandir traz o tipo de cada entrada junto da listagem, sem um stat por arquivo.
+    with os.scandir(audio_folder) as entries:
+        audio_files = sorted(entry.name for entry in entries if entry.is_file())
     if not audio_files:
         progress_queue.put(("status", "Erro: Nenhum arquivo de áudio encontrado na pasta de lote.", "error")); return False
         
     total_files = len(audio_files)
+    # O estilo das legendas é o mesmo em todos os itens; a string ASS é montada uma vez só.
+    if params.get('subtitle_style') is not None:
+        params = {**params, '_subtitle_style_cached': _build_subtitle_style_string(params['subtitle_style'])}
+    jobs = []
+    videos_by_folder: Dict[str, List[str]] = {}
     for i, audio_filename in enumerate(audio_files):
         if cancel_event.is_set(): return False
         
-        progress_queue.put(("batch_progress", (i) / total_files))
         log_prefix = f"Lote {i+1}/{total_files}"
-        progress_queue.put(("status", f"--- Iniciando {log_prefix}: {audio_filename} ---", "info"))
         
-        lang_code_match = re.search(r'_(?P<lang>[a-z]{2}(_[A-Z]{2})?)\.', audio_filename)
+        lang_code_match = _LANG_CODE_RE.search(audio_filename)
         lang_code = lang_code_match.group('lang') if lang_code_match else 'default'
         
         video_lang_folder = os.path.join(video_parent_folder, lang_code)
         if not os.path.isdir(video_lang_folder):
             video_lang_folder = video_parent_folder
         
-        available_videos = sorted([os.path.join(video_lang_folder, f) for f in os.listdir(video_lang_folder) if f.lower().endswith(('.mp4', '.mov', '.mkv'))])
+        # Vários áudios costumam apontar para a mesma pasta de idioma; lista cada uma só uma vez.
+        available_videos = videos_by_folder.get(video_lang_folder)
+        if available_videos is None:
+            with os.scandir(video_lang_folder) as entries:
+                available_videos = sorted(entry.path for entry in entries if entry.is_file() and entry.name.lower().endswith(('.mp4', '.mov', '.mkv')))
+            videos_by_folder[video_lang_folder] = available_videos
         if not available_videos:
             progress_queue.put(("status", f"[{log_prefix}] Aviso: Nenhum vídeo encontrado em '{video_lang_folder}'. Pulando.", "warning")); continue
 
@@ -503,10 +649,65 @@ def _run_batch_processing(params: Dict[str, Any], progress_queue: Queue, cancel_
             'output_filename_single': f"video_final_{Path(audio_filename).stem}.mp4"
         }
         
-        item_success = _run_single_item_processing(item_params, progress_queue, cancel_event)
-        
-        if not item_success and not cancel_event.is_set():
-            progress_queue.put(("status", f"[{log_prefix}] Falha ao processar o item. Continuando...", "error"))
+        jobs.append((i, log_prefix, audio_filename, item_params))
+
+    # Cada item roda em seu próprio processo FFmpeg; as threads apenas aguardam
+    # os subprocessos, então alguns itens simultâneos aproveitam os núcleos livres.
+    # Com encoder de hardware o gargalo é a GPU (e o número de sessões de codificação),
+    # então o padrão é um item por vez. No libx264 os núcleos são divididos entre os itens.
+    cpu_count = os.cpu_count() or 1
+    encoder = _select_codec_params(params.get('video_codec', 'Automático'), tuple(params.get('available_encoders') or ()))[1]
+    default_concurrency = 1 if encoder != "libx264" else max(1, min(4, cpu_count // 2))
+    concurrency = max(1, min(params.get('batch_concurrency') or default_concurrency, len(jobs) or 1))
+    if concurrency > 1:
+        for job in jobs: job[3]['encoder_threads'] = max(1, cpu_count // concurrency)
+    item_progress = [0.0] * total_files
+    progress_lock = threading.Lock()
+    active_items = set()
+
+    def _run_job(job) -> bool:
+        idx, log_prefix, audio_filename, item_params = job
+        if cancel_event.is_set(): return False
+        progress_queue.put(("status", f"--- Iniciando {log_prefix}: {audio_filename} ---", "info"))
+
+        def item_progress_callback(p: float):
+            with progress_lock:
+                item_progress[idx] = p
+                batch_pct = sum(item_progress) / total_files
+                # Há uma só barra por item: com itens em paralelo ela acompanha o de
+                # menor índice ainda em andamento, em vez de saltar entre eles.
+                show_item = idx == min(active_items)
+            if show_item: progress_queue.put(("progress", p))
+            progress_queue.put(("batch_progress", batch_pct))
+
+        with progress_lock: active_items.add(idx)
+        try:
+            return _run_single_item_processing(item_params, progress_queue, cancel_event, progress_callback=item_progress_callback)
+        finally:
+            with progress_lock: active_items.discard(idx)
+
+    progress_queue.put(("batch_progress", 0.0))
+    # Enquanto os primeiros itens codificam, o ffprobe dos seguintes já roda em paralelo;
+    # a saída fica no cache de _run_ffprobe e cada item a encontra pronta ao começar.
+    ffmpeg_path = params.get('ffmpeg_path')
+    paths_to_prefetch = dict.fromkeys(
+        job[3][key] for job in jobs[concurrency:] for key in ('narration_file_single', 'media_path_single')
+    ) if ffmpeg_path else {}
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="probe") as probe_pool, \
+         ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as executor:
+        prefetches = [probe_pool.submit(_probe_media_properties, path, ffmpeg_path) for path in paths_to_prefetch]
+        futures = {executor.submit(_run_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            log_prefix = futures[future][1]
+            try:
+                item_success = future.result()
+            except Exception as e:
+                logger.error(f"[{log_prefix}] Exceção ao processar o item: {e}", exc_info=True)
+                item_success = False
+            if not item_success and not cancel_event.is_set():
+                progress_queue.put(("status", f"[{log_prefix}] Falha ao processar o item. Continuando...", "error"))
+        for prefetch in prefetches: prefetch.cancel()
 
+    if cancel_event.is_set(): return False
     progress_queue.put(("batch_progress", 1.0))
     return True